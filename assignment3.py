@@ -13,7 +13,11 @@ Last modified on Tue Nov 24 15:33 2020
 # from assignment1.py import DGraph as Graph
 # Also make sure to submit your assignment1.py (or whatever you end up)
 # calling it, alongside this file so that the imports work!
+from ccbase import instrument
 from ccbase.graph import Graph
+from ccbase.classify import classify_nodes
+from ccbase.dsep import as_context, d_separated, d_separated_many, shortest_open_path
+from ccbase.paths import iter_paths
 
 
 ###
@@ -39,13 +43,7 @@ def find_forks(dg):
 			A list containing all Nodes (either object or their name/id) that
 			represent forks in the network.
 	"""
-	# gehe alle knoten durch
-	# wenn von dem Knoten mehr als zwei Kanten ausgehen ist es ein Fork?
-	forks = []
-	for node in dg.nodes:
-		if len(dg.get_parents(node)) < 2 and len(dg.get_children(node)) > 1:
-			forks.append(node)
-	return forks
+	return classify_nodes(dg)["forks"]
 
 def find_colliders(dg):
 	"""
@@ -62,12 +60,9 @@ def find_colliders(dg):
 			A list containing all Nodes (either object or their name/id) that
 			represent colliders in the network.
 	"""
-	forks = []
-	for node in dg.nodes:
-		if len(dg.get_parents(node)) > 1 and len(dg.get_children(node)) < 2:
-			forks.append(node)
-	return forks
+	return classify_nodes(dg)["colliders"]
 
+@instrument.query
 def get_paths(dg, node_x, node_y):
 	"""
 		Computes all undirected paths between node_x and node_y within
@@ -87,27 +82,14 @@ def get_paths(dg, node_x, node_y):
 		list of lists of ccbase.nodes.Node or Strings
 			A list of lists of node objects (or node names) that each represent
 			an undirected path from node_x to node_y.
+
+		See `ccbase.paths.enumerate_paths` for a bounded variant storing
+		the paths compactly as integer arrays.
 	"""
 
-	undirected = dg.to_undirected()
-	list = []
-	path = []
-	paths = []
-	search(undirected, node_x, node_y, list, path, paths)
-	return paths
-
-def search(graph, node_x, node_y, list, path, paths): 
-	list.append(node_x)
-	path.append(node_x) 
-	if node_x == node_y: 
-		paths.append(path.copy())
-	else: 
-		for child in graph.get_children(node_x): 
-			if not child in list: 
-				search(graph, child, node_y, list, path, paths) 
-	path.pop() 
-	list.pop()
+	return list(iter_paths(dg, node_x, node_y))
 
+@instrument.query
 def is_collider(dg, node, path):
 	"""
 		Checks whether or not the given node is a collider with respect to the given
@@ -131,12 +113,15 @@ def is_collider(dg, node, path):
 			True if the given node is a collider with respect to the given path
 			within the graph, False otherwise.
 	"""
-	parents = 0
-	for n in path:
-		if n is not node and n in dg.get_parents(node):
-			parents += 1
-	return parents > 1
+	node = getattr(node, "name", node)
+	path = [getattr(n, "name", n) for n in path]
+	parents = set(dg.iter_parents(node))
+	for index in range(1, len(path) - 1):
+		if path[index] == node:
+			return path[index-1] in parents and path[index+1] in parents
+	return False
 
+@instrument.query
 def is_path_open(dg, path, nodes_z):
 	""" 
 		Checks whether or not the given path is open conditioned on the given nodes.
@@ -151,27 +136,20 @@ def is_path_open(dg, path, nodes_z):
 			the graph.
 		nodes_z: iterable of ccbase.nodes.Node or Strings
 			The set of conditioned nodes (or their names), that might influence the 
-			paths between node_x and node_y
+			paths between node_x and node_y. When checking many paths, a
+			ccbase.dsep.QueryContext for these nodes can be passed instead,
+			so that their ancestors are only computed once.
 
 		Returns
 		--------
 		bool
 			False if the path is blocked given given the nodes_z, True otherwise.
 	"""
-	open = True
-	for index in range(1,len(path) - 1):
-		if path[index-1] in dg.get_parents(path[index]) and path[index+1] in dg.get_parents(path[index]):
-			open = path[index] in nodes_z
-			for child in dg.get_children(path[index]):
-				open = open and child in nodes_z
-		elif path[index-1] in dg.get_children(path[index]) and path[index+1] in dg.get_children(path[index]):
-			open = path[index] not in nodes_z
-		else:
-			open = path[index] not in nodes_z
-		if not open:
-			break
-	return open
+	# A collider is open if it is one of the nodes_z or one of their
+	# ancestors, which the context computes once for all positions.
+	return as_context(dg, nodes_z).is_path_open(path)
 
+@instrument.query
 def unblocked_path_exists(dg, node_x, node_y, nodes_z):
 	"""
 		Computes if there is at least one unblocked undirected path
@@ -195,11 +173,37 @@ def unblocked_path_exists(dg, node_x, node_y, nodes_z):
 			False if all undirected paths between node_x and node_y are blocked 
 			given the nodes_z, True otherwise.
 	"""
-	for path in get_paths(dg,node_x,node_y): 
-		if is_path_open(dg, path, nodes_z):
-				return True
-	return False
+	# Searching for a single open path costs O(V+E), whereas enumerating
+	# paths can take exponential time if there is none.
+	return find_open_path(dg, node_x, node_y, nodes_z) is not None
+
+@instrument.query
+def find_open_path(dg, node_x, node_y, nodes_z):
+	"""
+		Finds one of the shortest undirected paths between node_x and
+		node_y that are not blocked given nodes_z, without enumerating
+		any paths.
+
+		Parameters
+		---------
+		dg: ccbase.graph.Graph
+			The graph that should contain all the nodes.
+		node_x: ccbase.nodes.Node or String
+			The first of the two nodes.
+		node_y: ccbase.nodes.Node or String
+			The second of the two nodes.
+		nodes_z: iterable of ccbase.nodes.Node or Strings
+			The set of conditioned nodes.
+
+		Returns
+		--------
+		list of Strings or None
+			The node names of an open path from node_x to node_y, or None
+			if all paths between them are blocked given nodes_z.
+	"""
+	return shortest_open_path(dg, node_x, node_y, nodes_z)
 
+@instrument.query
 def check_independence(dg, nodes_x, nodes_y, nodes_z):
 	"""
 		Computes whether or not nodes in nodes_x are conditionally 
@@ -224,12 +228,39 @@ def check_independence(dg, nodes_x, nodes_y, nodes_z):
 		bool
 			True if all nodes in nodes_x are conditionally independent of all
 			nodes in nodes_y given the nodes in nodes_z, False otherwise.
+
+		Note
+		----------
+		A collider is open if and only if it or one of its descendants is
+		in nodes_z, as for is_path_open and unblocked_path_exists.
+	"""
+	# Rather than checking every pair of nodes via their paths, all nodes
+	# in nodes_x are handled in a single reachability traversal.
+	return d_separated(dg, nodes_x, nodes_y, nodes_z)
+
+def check_independence_many(dg, queries):
+	"""
+		Computes check_independence for many queries on the same graph.
+		Queries sharing the same nodes_z also share the work that only
+		depends on nodes_z, as well as the nodes reachable from each node
+		in nodes_x.
+
+		Parameters
+		---------
+		dg: ccbase.graph.Graph
+			The graph that should contain all the nodes.
+		queries: iterable of (nodes_x, nodes_y, nodes_z) tuples
+			The queries, each given by the same arguments as for
+			check_independence. The iterable is consumed lazily, so it
+			can be a generator streaming the queries.
+
+		Yields
+		----------
+		bool
+			The result of check_independence for each query, in the same
+			order as the queries.
 	"""
-	for node_x in nodes_x:
-		for node_y in nodes_y:
-			if unblocked_path_exists(dg,node_x,node_y,nodes_z):
-				return False
-	return True
+	return d_separated_many(dg, queries)
 
 def create_example_graph():
 	"""
@@ -274,3 +305,34 @@ if __name__ == "__main__":
 		nodes_z, unblocked_path_exists(g, "B", "R", nodes_z)))
 	print("Are Nodes B and R independent given nodes {}?: {}".format(
 		nodes_z, check_independence(g, ("B"), ("R"), nodes_z)))
+	assert not is_path_open(g, path, [])
+	assert check_independence(g, ("B"), ("R"), nodes_z)
+
+	# A collider is also opened by conditioning on one of its descendants.
+	dg = Graph.from_edges([("X", "C"), ("Y", "C"), ("C", "D"), ("D", "E"), ("W", "X")])
+	path = ["X", "C", "Y"]
+	assert is_collider(dg, "C", path)
+	assert not is_path_open(dg, path, [])
+	assert is_path_open(dg, path, ["C"])
+	assert is_path_open(dg, path, ["E"])
+	assert check_independence(dg, ["X"], ["Y"], [])
+	assert not check_independence(dg, ["X"], ["Y"], ["D"])
+	assert not check_independence(dg, ["W"], ["Y"], ["E"])
+	assert check_independence(dg, ["W"], ["Y"], ["X", "E"])
+
+	# The reachability based and the path based functions agree.
+	for graph in (g, dg):
+		names = sorted(graph.nodes)
+		for nodes_z in [[]] + [[n] for n in names] + [names[:2], names[-2:]]:
+			for node_x in names:
+				for node_y in names:
+					if node_x == node_y or node_x in nodes_z or node_y in nodes_z:
+						continue
+					open_path = find_open_path(graph, node_x, node_y, nodes_z)
+					expected = any(is_path_open(graph, p, nodes_z)
+								   for p in get_paths(graph, node_x, node_y))
+					assert (open_path is not None) == expected
+					assert unblocked_path_exists(graph, node_x, node_y, nodes_z) == expected
+					assert check_independence(graph, [node_x], [node_y], nodes_z) != expected
+					if open_path is not None:
+						assert is_path_open(graph, open_path, nodes_z)
@@ -0,0 +1,6 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the graph classes in `ccbase`. Each module can be run on
+its own, e.g. `python -m benchmarks.memory`.
+"""
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs the benchmark suite, see `benchmarks.run`.
+"""
+
+import sys
+
+from benchmarks.run import main
+
+sys.exit(main())
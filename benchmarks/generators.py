@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seeded generators for synthetic DAGs of arbitrary size. All generators
+only create edges from nodes with a lower to nodes with a higher index,
+so the resulting graphs are always acyclic. Nodes are named "n0", "n1",
+... in that order and edges are added in a fixed order, so that the same
+seed always results in the same graph, independent of string hashing.
+"""
+
+import random
+
+from ccbase.graph import Graph
+
+
+def _names(num_nodes):
+    return ["n{}".format(i) for i in range(num_nodes)]
+
+
+def _graph(names, edges):
+    """
+        Creates the graph from a set of (int, int) edges.
+    """
+    return Graph.from_edges(((names[a], names[b]) for a, b in sorted(edges)), nodes=names)
+
+
+def random_dag(num_nodes, avg_degree=3.0, seed=0):
+    """
+        Creates an Erdős–Rényi style random DAG, in which every node has on
+        average avg_degree parents chosen uniformly among all nodes with a
+        lower index. Runs in O(V+E), so that it also scales to very large
+        graphs.
+    """
+    rng = random.Random(seed)
+    names = _names(num_nodes)
+    edges = set()
+    num_edges = int(avg_degree * num_nodes)
+    if num_nodes > 1:
+        max_edges = num_nodes * (num_nodes - 1) // 2
+        while len(edges) < min(num_edges, max_edges):
+            a, b = rng.randrange(num_nodes), rng.randrange(num_nodes)
+            if a != b:
+                edges.add((min(a, b), max(a, b)))
+    return _graph(names, edges)
+
+
+def layered_dag(num_nodes, num_layers=10, avg_degree=3.0, seed=0):
+    """
+        Creates a layered network, in which the nodes are split into
+        num_layers layers and every node has on average avg_degree parents
+        in the preceding layer.
+    """
+    rng = random.Random(seed)
+    names = _names(num_nodes)
+    size = max(1, -(-num_nodes // num_layers))
+    edges = set()
+    for i in range(size, num_nodes):
+        start = (i // size - 1) * size
+        for _ in range(int(avg_degree) + (rng.random() < avg_degree % 1)):
+            edges.add((rng.randrange(start, start + size), i))
+    return _graph(names, edges)
+
+
+def chain_dag(num_nodes, seed=0):
+    """
+        Creates a single long chain n0 -> n1 -> ... -> n(num_nodes-1).
+    """
+    names = _names(num_nodes)
+    return Graph.from_edges(zip(names, names[1:]), nodes=names)
+
+
+def star_dag(num_nodes, seed=0):
+    """
+        Creates a wide star, in which n0 is the only parent of all other nodes.
+    """
+    names = _names(num_nodes)
+    return Graph.from_edges(((names[0], n) for n in names[1:]), nodes=names)
+
+
+def v_structure_dag(num_nodes, num_parents=4, seed=0):
+    """
+        Creates a dense, v-structure heavy graph: every second node is a
+        collider with num_parents parents among the preceding nodes.
+    """
+    rng = random.Random(seed)
+    names = _names(num_nodes)
+    edges = set()
+    for i in range(2, num_nodes, 2):
+        for _ in range(num_parents):
+            edges.add((rng.randrange(i), i))
+    return _graph(names, edges)
+
+
+GENERATORS = {
+    "random": random_dag,
+    "layered": layered_dag,
+    "chain": chain_dag,
+    "star": star_dag,
+    "v_structures": v_structure_dag,
+}
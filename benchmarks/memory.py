@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Measures the memory used per node and per edge of a `ccbase.graph.Graph`,
+comparing the slotted `ccbase.nodes.Node` with the former dict based node
+class (reproduced as `LegacyNode` below).
+
+Usage: python -m benchmarks.memory [num_nodes] [edges_per_node]
+"""
+
+import random
+import sys
+import tracemalloc
+
+from ccbase.graph import Graph
+from ccbase.nodes import Node
+
+
+class LegacyNode(object):
+    """
+        The node class as it was before using __slots__: every instance
+        holds a full instance __dict__ and hashes its name on every lookup.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.parents = {}
+        self.children = {}
+
+    def add_parent(self, parent):
+        self.parents[parent.name] = parent
+
+    def add_child(self, child):
+        self.children[child.name] = child
+
+    def remove_parent(self, parent):
+        if parent.name in self.parents:
+            del self.parents[parent.name]
+
+    def remove_child(self, child):
+        if child.name in self.children:
+            del self.children[child.name]
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __eq__(self, other):
+        try:
+            return other.name == self.name
+        except AttributeError:
+            return other == self.name
+
+
+def measure(node_class, num_nodes, edges_per_node, seed=0):
+    """
+        Builds a random DAG with the given node class and measures the
+        memory allocated for its nodes and its edges.
+
+        Parameters
+        ----------
+        node_class: type
+            The node class to use, e.g. `ccbase.nodes.Node`.
+        num_nodes: int
+            The number of nodes of the graph.
+        edges_per_node: int
+            The (maximum) number of parents of each node.
+        seed: int, optional (Default:0)
+            The seed of the random number generator.
+
+        Returns
+        -------
+        dict
+            The number of nodes and edges as well as the bytes per node and
+            the bytes per edge.
+    """
+    rng = random.Random(seed)
+    # The names are created beforehand, they are shared by both variants.
+    names = ["n{}".format(i) for i in range(num_nodes)]
+    edges = [(names[rng.randrange(i)], names[i])
+             for i in range(1, num_nodes) for _ in range(edges_per_node)]
+    tracemalloc.start()
+    graph = Graph()
+    start = tracemalloc.get_traced_memory()[0]
+    for name in names:
+        graph.add_node(node_class(name))
+    after_nodes = tracemalloc.get_traced_memory()[0]
+    for a, b in edges:
+        graph.add_edge(a, b)
+    after_edges = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    num_edges = sum(graph.out_degree(n) for n in graph.nodes)
+    return {"nodes": num_nodes, "edges": num_edges,
+            "bytes_per_node": (after_nodes - start) / num_nodes,
+            "bytes_per_edge": (after_edges - after_nodes) / max(num_edges, 1)}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    num_nodes = int(argv[0]) if argv else 100000
+    edges_per_node = int(argv[1]) if len(argv) > 1 else 3
+    print("{:<12} {:>10} {:>10} {:>15} {:>15}".format(
+        "node class", "nodes", "edges", "bytes/node", "bytes/edge"))
+    for label, node_class in (("before", LegacyNode), ("after", Node)):
+        res = measure(node_class, num_nodes, edges_per_node)
+        print("{:<12} {:>10} {:>10} {:>15.1f} {:>15.1f}".format(
+            label, res["nodes"], res["edges"], res["bytes_per_node"],
+            res["bytes_per_edge"]))
+
+
+if __name__ == "__main__":
+    main()
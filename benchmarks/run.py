@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Times the functions of `assignment3` and the `ccbase.graph.Graph` methods
+they rely on, on the synthetic graphs of `benchmarks.generators`, and
+records the peak memory of each run. Results are written as JSON and can
+be compared against a stored baseline to detect regressions.
+
+Timings depend on the machine, so no baseline is shipped with the
+repository. Record one on your machine first with --save-baseline, then
+later runs on the same machine are compared against it and exit with
+status 1 on a regression.
+
+Usage: python -m benchmarks [--max-size N] [--output results.json]
+                            [--baseline benchmarks/baseline.json]
+                            [--save-baseline] [--tolerance 0.5]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import assignment3
+from benchmarks.generators import GENERATORS
+
+SIZES = [10, 100, 1000, 10000, 100000, 1000000]
+# The default, machine local baseline, which is not under version control.
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _random_query(graph, rng, num_z=3):
+    names = list(graph.nodes)
+    return rng.choice(names), rng.choice(names), rng.sample(names, min(num_z, len(names)))
+
+
+def _find_forks(graph, rng):
+    return lambda: assignment3.find_forks(graph)
+
+
+def _find_colliders(graph, rng):
+    return lambda: assignment3.find_colliders(graph)
+
+
+def _get_paths(graph, rng):
+    x, y, _ = _random_query(graph, rng)
+    return lambda: assignment3.get_paths(graph, x, y)
+
+
+def _shortest_path(graph, x, y):
+    """
+        Finds a shortest undirected path from x to y by breadth first
+        search, or returns [x] if there is none.
+    """
+    neighbours = graph.to_undirected(as_view=True).iter_children
+    previous = {x: None}
+    queue = deque([x])
+    while queue:
+        node = queue.popleft()
+        if node == y:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = previous[node]
+            return path[::-1]
+        for n in neighbours(node):
+            if n not in previous:
+                previous[n] = node
+                queue.append(n)
+    return [x]
+
+
+def _is_path_open(graph, rng):
+    x, y, nodes_z = _random_query(graph, rng)
+    path = _shortest_path(graph, x, y)
+    return lambda: assignment3.is_path_open(graph, path, nodes_z)
+
+
+def _unblocked_path_exists(graph, rng):
+    x, y, nodes_z = _random_query(graph, rng)
+    return lambda: assignment3.unblocked_path_exists(graph, x, y, nodes_z)
+
+
+def _check_independence(graph, rng):
+    x, y, nodes_z = _random_query(graph, rng)
+    return lambda: assignment3.check_independence(graph, [x], [y], nodes_z)
+
+
+def _to_undirected(graph, rng):
+    return graph.to_undirected
+
+
+def _copy(graph, rng):
+    return graph.copy
+
+
+# Each benchmark maps its name to the largest graph it is run on and to a
+# setup function, which receives a graph and a random number generator and
+# returns the call to time. Path enumeration is exponential in the size of
+# the graph and is therefore only run on the smallest graphs.
+BENCHMARKS = {
+    "find_forks": (SIZES[-1], _find_forks),
+    "find_colliders": (SIZES[-1], _find_colliders),
+    "get_paths": (10, _get_paths),
+    "is_path_open": (10000, _is_path_open),
+    "unblocked_path_exists": (SIZES[-1], _unblocked_path_exists),
+    "check_independence": (SIZES[-1], _check_independence),
+    "Graph.to_undirected": (SIZES[-1], _to_undirected),
+    "Graph.copy": (SIZES[-1], _copy),
+}
+
+
+def measure(func, repeat=3):
+    """
+        Runs the given function repeat times and returns the best time in
+        seconds, as well as the peak memory in bytes of an additional run.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run(max_size=SIZES[-1], generators=None, benchmarks=None, repeat=3, seed=0, log=None):
+    """
+        Runs all selected benchmarks on all selected graphs up to the given
+        number of nodes.
+
+        Returns
+        -------
+        list of dict
+            One record per benchmark, generator and size, holding the time
+            in seconds and the peak memory in bytes (or the error if the
+            function failed).
+    """
+    results = []
+    for gen_name in generators or sorted(GENERATORS):
+        for size in SIZES:
+            if size > max_size:
+                break
+            graph = GENERATORS[gen_name](size, seed=seed)
+            num_edges = sum(graph.out_degree(n) for n in graph.nodes)
+            for bench in benchmarks or sorted(BENCHMARKS):
+                limit, setup = BENCHMARKS[bench]
+                if size > limit:
+                    continue
+                record = {"benchmark": bench, "generator": gen_name,
+                          "nodes": size, "edges": num_edges}
+                try:
+                    seconds, peak = measure(setup(graph, random.Random(seed)), repeat)
+                    record.update(seconds=seconds, peak_bytes=peak)
+                except (RecursionError, MemoryError) as e:
+                    record["error"] = type(e).__name__
+                results.append(record)
+                if log is not None:
+                    log(_format(record))
+    return results
+
+
+def _key(record):
+    return record["benchmark"], record["generator"], record["nodes"]
+
+
+def _format(record):
+    if "error" in record:
+        res = record["error"]
+    else:
+        res = "{:10.6f}s {:12d}B".format(record["seconds"], record["peak_bytes"])
+    return "{:<22} {:<13} {:>8} {}".format(record["benchmark"], record["generator"],
+                                           record["nodes"], res)
+
+
+def compare(results, baseline, tolerance=0.5, min_seconds=1e-3):
+    """
+        Compares results with a baseline.
+
+        Parameters
+        ----------
+        results, baseline: list of dict
+            Benchmark records as returned by `run`.
+        tolerance: float, optional (Default:0.5)
+            The relative slowdown (or memory increase) that is tolerated.
+        min_seconds: float, optional
+            Timings below this in the baseline are too noisy to compare.
+
+        Returns
+        -------
+        list of Strings
+            A description of every regression.
+    """
+    old = {_key(r): r for r in baseline}
+    regressions = []
+    for record in results:
+        before = old.get(_key(record))
+        if before is None or "error" in before:
+            continue
+        if "error" in record:
+            regressions.append("{}: {}".format(_format(record), "failed"))
+            continue
+        if before["seconds"] >= min_seconds and \
+                record["seconds"] > before["seconds"] * (1 + tolerance):
+            regressions.append("{}: {:.6f}s -> {:.6f}s".format(
+                " ".join(map(str, _key(record))), before["seconds"], record["seconds"]))
+        if record["peak_bytes"] > before["peak_bytes"] * (1 + tolerance) + 1024:
+            regressions.append("{}: {}B -> {}B peak memory".format(
+                " ".join(map(str, _key(record))), before["peak_bytes"], record["peak_bytes"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=10000,
+                        help="the largest number of nodes to benchmark")
+    parser.add_argument("--generator", action="append", choices=sorted(GENERATORS))
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="the JSON file holding the baseline results")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    results = run(args.max_size, args.generator, args.benchmark, args.repeat,
+                  args.seed, log=print)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+        return 0
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        return 1 if regressions else 0
+    print("No baseline found at {}, run with --save-baseline to record one "
+          "on this machine.".format(args.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
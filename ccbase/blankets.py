@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Markov blankets. The Markov blanket of a node consists of its parents, its
+children and the other parents of its children, i.e. of its neighbours in
+the moral graph. Given its blanket, a node is independent of all other
+nodes.
+
+`markov_blankets` computes the blankets of all nodes in one sweep over the
+edges: every edge p -> c puts p and c into each other's blanket, and all
+parents of c into the blankets of each other. For frozen graphs this sweep
+is vectorized with NumPy if it is installed. The result can be returned as
+a sparse boolean matrix, using SciPy if it is installed.
+"""
+
+from array import array
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+from .dsep import _adjacency, _check_nodes
+from .frozen import INDICES_TYPE, INDPTR_TYPE, int_array, np
+
+
+def markov_blanket(dg, node):
+    """
+        Computes the Markov blanket of the given node.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph (or view or frozen graph) containing the node.
+        node: ccbase.nodes.Node or String
+            The node whose Markov blanket is computed.
+
+        Returns
+        -------
+        set of Strings
+            The names of the parents, children and the children's other
+            parents of the node.
+
+        Raises
+        ----------
+        ValueError
+            If the node is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    (key,) = _check_nodes(dg, (node,), index)
+    res = set(parents(key))
+    for c in children(key):
+        res.add(c)
+        res.update(parents(c))
+    res.discard(key)
+    if index is None:
+        return res
+    names = dg.names
+    return {names[k] for k in res}
+
+
+def _blanket_sets(parents, keys):
+    """
+        Computes the Markov blankets of all keys in one sweep over the
+        parents of each key.
+    """
+    res = {key: set() for key in keys}
+    for key in keys:
+        key_parents = list(parents(key))
+        if not key_parents:
+            continue
+        res[key].update(key_parents)
+        for p in key_parents:
+            blanket = res[p]
+            blanket.add(key)
+            blanket.update(key_parents)
+    for key, blanket in res.items():
+        blanket.discard(key)
+    return res
+
+
+def _blanket_arrays(graph):
+    """
+        Computes the Markov blankets of all nodes of a frozen graph with
+        NumPy. The work and memory are linear in the number of edges plus
+        the sum of the squared numbers of parents.
+
+        Returns
+        -------
+        (indptr, indices) tuple of NumPy arrays
+            The blankets in CSR form, with the ids of every blanket sorted.
+    """
+    n = graph.num_nodes
+    indptr = np.asarray(graph.parent_indptr, dtype=np.int64)
+    parents = np.asarray(graph.parent_indices, dtype=np.int64)
+    in_degree = np.diff(indptr)
+    # The child of every edge, in the order of parents.
+    children = np.repeat(np.arange(n, dtype=np.int64), in_degree)
+    # Every edge p -> c is paired with every edge q -> c to marry p and q.
+    group = in_degree[children]
+    edges = np.repeat(np.arange(len(parents), dtype=np.int64), group)
+    offsets = np.arange(len(edges), dtype=np.int64) - np.repeat(np.cumsum(group) - group, group)
+    married = parents[indptr[children][edges] + offsets]
+    rows = np.concatenate((parents, children, parents[edges]))
+    cols = np.concatenate((children, parents, married))
+    keys = (rows * n + cols)[rows != cols]
+    # Sorting and dropping duplicates in place is considerably faster
+    # than np.unique for large arrays.
+    keys.sort()
+    if len(keys):
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    rows, cols = np.divmod(keys, n)
+    res_indptr = np.zeros(n + 1, dtype=np.dtype(INDPTR_TYPE))
+    np.cumsum(np.bincount(rows, minlength=n), out=res_indptr[1:])
+    return res_indptr, cols.astype(np.dtype(INDICES_TYPE))
+
+
+def _to_matrix(indptr, indices, n):
+    if sparse is None:
+        return indptr, indices
+    data = np.ones(len(indices), dtype=bool)
+    return sparse.csr_matrix((data, indices, indptr), shape=(n, n))
+
+
+def markov_blankets(dg, as_matrix=False):
+    """
+        Computes the Markov blankets of all nodes at once.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph (or view or frozen graph) whose blankets are computed.
+        as_matrix: Bool, optional (Default:False)
+            If true, the blankets are returned as a sparse boolean matrix
+            rather than as sets.
+
+        Returns
+        -------
+        dict or sparse matrix
+            A dictionary containing node-name:set pairs, each set holding
+            the names of the node's Markov blanket. If as_matrix is true, a
+            `scipy.sparse.csr_matrix` in which row i holds the blanket of
+            node i, with the nodes numbered by their ids (frozen graphs)
+            or in the order of dg.nodes. Without SciPy, the (indptr,
+            indices) arrays of that matrix are returned instead, see
+            `ccbase.frozen`.
+    """
+    if np is not None and hasattr(dg, "parent_indptr"):
+        n = dg.num_nodes
+        indptr, indices = _blanket_arrays(dg)
+        if as_matrix:
+            return _to_matrix(indptr, indices, n)
+        names = dg.names
+        ptr, ids = indptr.tolist(), indices.tolist()
+        return {names[i]: {names[j] for j in ids[ptr[i]:ptr[i + 1]]} for i in range(n)}
+
+    parents, _, index = _adjacency(dg)
+    keys = list(range(dg.num_nodes)) if index is not None else list(dg.nodes)
+    blankets = _blanket_sets(parents, keys)
+    if as_matrix:
+        indptr = array(INDPTR_TYPE, [0])
+        indices = array(INDICES_TYPE)
+        if index is None:
+            ids = {k: i for i, k in enumerate(keys)}
+            for key in keys:
+                indices.extend(sorted(ids[k] for k in blankets[key]))
+                indptr.append(len(indices))
+        else:
+            for key in keys:
+                indices.extend(sorted(blankets[key]))
+                indptr.append(len(indices))
+        return _to_matrix(int_array(indptr, INDPTR_TYPE), int_array(indices, INDICES_TYPE),
+                          len(keys))
+    if index is None:
+        return blankets
+    names = dg.names
+    return {names[i]: {names[j] for j in blanket} for i, blanket in blankets.items()}
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Classification of the nodes of a graph as forks, colliders and chains,
+based only on the number of parents and children of every node.
+"""
+
+from . import instrument
+
+
+def _classify(in_degree, out_degree):
+    """
+        Classifies nodes as forks, colliders and chains based on their
+        number of parents and children. Works on single integers as well as
+        elementwise on NumPy arrays.
+    """
+    forks = (in_degree < 2) & (out_degree > 1)
+    colliders = (in_degree > 1) & (out_degree < 2)
+    chains = (in_degree == 1) & (out_degree == 1)
+    return forks, colliders, chains
+
+
+@instrument.query
+def classify_nodes(dg):
+    """
+        Computes the forks, colliders and chains within the given graph in
+        a single pass over the degrees of all nodes. A fork has less than
+        two parents and more than one child, a collider more than one parent
+        and less than two children and a chain exactly one parent and one
+        child.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph whose nodes are to be classified.
+
+        Returns
+        ----------
+        dict
+            A dictionary with the keys "forks", "colliders" and "chains",
+            each containing a list of the corresponding node names.
+    """
+    try:
+        in_degrees, out_degrees = dg.in_degrees(), dg.out_degrees()
+    except AttributeError: #Only frozen graphs provide degree arrays.
+        in_degrees = out_degrees = None
+    if hasattr(in_degrees, "nonzero"):
+        # NumPy arrays of a frozen graph: classify all nodes at once.
+        names = dg.names
+        return {key: [names[i] for i in mask.nonzero()[0].tolist()]
+                for key, mask in zip(("forks", "colliders", "chains"),
+                                     _classify(in_degrees, out_degrees))}
+    res = {"forks": [], "colliders": [], "chains": []}
+    forks, colliders, chains = res["forks"], res["colliders"], res["chains"]
+    for node, in_degree, out_degree in dg.iter_degrees():
+        is_fork, is_collider, is_chain = _classify(in_degree, out_degree)
+        if is_fork:
+            forks.append(node)
+        elif is_collider:
+            colliders.append(node)
+        elif is_chain:
+            chains.append(node)
+    return res
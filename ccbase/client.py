@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A small, synchronous client for `ccbase.server.GraphServer`:
+
+    with GraphClient(path="/tmp/ccbase.sock") as client:
+        client.load("alarm", "alarm.csv")
+        client.check_independence("alarm", ["A"], ["B"], ["C"])
+"""
+
+import json
+import socket
+from itertools import islice
+
+
+def _name(node):
+    return getattr(node, "name", node)
+
+
+def _names(nodes):
+    return [_name(n) for n in nodes]
+
+
+class ServerError(Exception):
+    """
+        Raised for errors reported by the server, other than invalid
+        arguments, which are raised as ValueError like the local functions.
+    """
+
+
+class GraphClient(object):
+    """
+        Connects to a `ccbase.server.GraphServer` on a Unix socket at path,
+        or on host and port.
+
+        Attributes
+        ----------
+        timeout: float
+            The socket timeout in seconds, or None to wait forever.
+    """
+
+    def __init__(self, path=None, host="127.0.0.1", port=8765, timeout=None):
+        if path is not None:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(timeout)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port), timeout)
+        self.timeout = timeout
+        self._file = self._socket.makefile("rb")
+        self._next_id = 0
+        # Responses that arrived before they were asked for.
+        self._responses = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+            Closes the connection.
+        """
+        self._file.close()
+        self._socket.close()
+
+    def _send(self, method, graph=None, **params):
+        self._next_id += 1
+        request = {"id": self._next_id, "method": method, "graph": graph, "params": params}
+        self._socket.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        return self._next_id
+
+    def _receive(self, request_id):
+        while request_id not in self._responses:
+            line = self._file.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection")
+            response = json.loads(line)
+            self._responses[response["id"]] = response
+        response = self._responses.pop(request_id)
+        if "error" in response:
+            error = response["error"]
+            if error["type"] in ("ValueError", "KeyError"):
+                raise ValueError(error["message"])
+            raise ServerError("{}: {}".format(error["type"], error["message"]))
+        return response["result"]
+
+    def call(self, method, graph=None, **params):
+        """
+            Sends a request and waits for its result.
+        """
+        return self._receive(self._send(method, graph, **params))
+
+    def graphs(self):
+        """
+            Returns the names of all graphs held by the server.
+        """
+        return self.call("graphs")
+
+    def load(self, graph, path, format=None):
+        """
+            Makes the server load the graph file at path (as seen by the
+            server) under the given name, see `ccbase.server.load_graph`.
+
+            Returns
+            -------
+            int
+                The number of nodes of the loaded graph.
+        """
+        return self.call("load", graph, path=path, format=format)
+
+    def unload(self, graph):
+        """
+            Makes the server drop the given graph.
+        """
+        return self.call("unload", graph)
+
+    def check_independence(self, graph, nodes_x, nodes_y, nodes_z):
+        """
+            Remote version of `assignment3.check_independence`.
+        """
+        return self.call("check_independence", graph, x=_names(nodes_x),
+                         y=_names(nodes_y), z=_names(nodes_z))
+
+    def check_independence_many(self, graph, queries, window=256):
+        """
+            Answers many independence queries, see
+            `assignment3.check_independence_many`. Up to window queries are
+            sent before their results are read, so that the server can
+            answer them in batches.
+
+            Yields
+            --------
+            bool
+                The result of each query, in input order.
+        """
+        queries = iter(queries)
+        pending = []
+        while True:
+            for nodes_x, nodes_y, nodes_z in islice(queries, window - len(pending)):
+                pending.append(self._send("check_independence", graph, x=_names(nodes_x),
+                                          y=_names(nodes_y), z=_names(nodes_z)))
+            if not pending:
+                return
+            yield self._receive(pending.pop(0))
+
+    def get_paths(self, graph, node_x, node_y, nodes_z=None, limit=None, max_len=None):
+        """
+            Remote version of `ccbase.paths.iter_paths`, returning at most
+            limit paths.
+        """
+        if nodes_z is not None:
+            nodes_z = _names(nodes_z)
+        return self.call("get_paths", graph, x=_name(node_x), y=_name(node_y), z=nodes_z,
+                         limit=limit, max_len=max_len)
+
+    def find_forks(self, graph):
+        """
+            Remote version of `assignment3.find_forks`.
+        """
+        return self.call("forks", graph)
+
+    def find_colliders(self, graph):
+        """
+            Remote version of `assignment3.find_colliders`.
+        """
+        return self.call("colliders", graph)
+
+    def get_ancestors(self, graph, node):
+        """
+            Returns the names of all ancestors of the given node.
+        """
+        return self.call("ancestors", graph, node=_name(node))
+
+    def get_descendants(self, graph, node):
+        """
+            Returns the names of all descendants of the given node.
+        """
+        return self.call("descendants", graph, node=_name(node))
@@ -0,0 +1,790 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reachability based d-separation ("Bayes-ball").
+
+Instead of enumerating every undirected path between two nodes, the
+functions in this module walk the graph once, keeping track of the
+direction in which each node was entered. A node can be entered from
+one of its children ("up") or from one of its parents ("down"), so every
+node is visited at most twice and a query costs O(V+E), independent of
+the number of paths in the graph.
+
+Queries that share the same conditioning set can share a `QueryContext`,
+which computes everything that only depends on the conditioning set once
+and caches the nodes reachable from sources that are queried repeatedly.
+
+As in the path based functions of the assignment, the end points of a
+path never block it, only the nodes in between do. A collider is open
+if it or one of its descendants is contained in the conditioning set.
+"""
+
+from collections import OrderedDict, deque
+
+from . import instrument
+from .views import SubgraphView
+
+# The maximum total number of keys held by the reach sets of a ReachCache.
+REACH_CACHE_BUDGET = 1000000
+
+
+def _name(node):
+    """
+        Returns the name of the given node, which can either be a
+        `ccbase.nodes.Node` or its name already.
+    """
+    return getattr(node, "name", node)
+
+
+def _adjacency(dg):
+    """
+        Returns the parents and children functions used for the traversal
+        together with the name:key index of the graph. Frozen graphs are
+        traversed on their integer ids, all other graphs on node names (in
+        which case the returned index is None).
+    """
+    try:
+        return dg.parent_ids, dg.child_ids, dg.index
+    except AttributeError: #We check for an attribute, rather than a type.
+        return dg.iter_parents, dg.iter_children, None
+
+
+def _check_nodes(dg, nodes, index=None):
+    """
+        Converts the given nodes to a set of keys (names, or ids if an
+        index is given) and makes sure that all of them are contained in
+        the graph.
+
+        Raises
+        ----------
+        ValueError
+            If any of the given nodes is not in the graph.
+    """
+    res = set()
+    for node in nodes:
+        name = _name(node)
+        if name not in dg.nodes:
+            raise ValueError("The graph does not contain a node called {}".format(name))
+        res.add(name if index is None else index[name])
+    return res
+
+
+def _conditioning_keys(dg, nodes_z, index=None):
+    """
+        Converts the given conditioning nodes to a set of keys, ignoring
+        all nodes that are not contained in the graph.
+    """
+    names = (n for n in map(_name, nodes_z) if n in dg.nodes)
+    if index is None:
+        return set(names)
+    return {index[n] for n in names}
+
+
+def ancestral_closure(parents, keys, closed=None):
+    """
+        Computes the given keys together with all their ancestors, using
+        an explicit stack.
+
+        Parameters
+        ----------
+        parents: callable
+            A function returning an iterable over the parents of a key.
+        keys: iterable
+            The keys (e.g. node names) to start from.
+        closed: set, optional
+            A set that already contains all ancestors of its members, e.g.
+            a previous result. Its members are included in the result
+            without visiting them again.
+
+        Returns
+        -------
+        set
+            The given keys together with all their ancestors.
+    """
+    with instrument.stage("ancestors"):
+        if closed is None:
+            res = set(keys)
+            stack = list(res)
+        else:
+            res = set(closed)
+            stack = [k for k in keys if k not in res]
+            res.update(stack)
+        while stack:
+            for p in parents(stack.pop()):
+                if p not in res:
+                    res.add(p)
+                    stack.append(p)
+    if instrument.active is not None:
+        instrument.active.count("traversal_steps", len(res))
+    return res
+
+
+def ancestral_subgraph(dg, nodes):
+    """
+        Creates a view on the given nodes and all their ancestors. Only
+        this part of a graph can affect whether the given nodes are
+        d-separated, no matter which of them are conditioned on.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        nodes: iterable of ccbase.nodes.Node or String
+            The nodes whose ancestors are to be kept.
+
+        Returns
+        -------
+        ccbase.views.SubgraphView
+            A view on the ancestral subgraph.
+
+        Raises
+        ----------
+        ValueError
+            If any of the given nodes is not in the graph.
+    """
+    return SubgraphView(dg, ancestral_closure(dg.iter_parents, _check_nodes(dg, nodes)))
+
+
+def moralize(dg):
+    """
+        Creates the moral graph of the given graph: the parents of every
+        node are connected ("married") and all edge directions are dropped.
+        As in `ccbase.graph.Graph.to_undirected`, undirected edges are
+        represented as edges in both directions.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The directed graph (or view) to moralize.
+
+        Returns
+        -------
+        ccbase.graph.Graph
+            A new, undirected graph containing all nodes of dg.
+    """
+    from .graph import Graph
+    res = Graph.from_edges(_moral_edges(dg), nodes=list(dg.nodes))
+    res.is_directed = False
+    return res
+
+
+def _moral_edges(dg):
+    for node in dg.nodes:
+        parents = list(dg.iter_parents(node))
+        for i, p in enumerate(parents):
+            yield p, node
+            yield node, p
+            for q in parents[i + 1:]:
+                yield p, q
+                yield q, p
+
+
+def _moral_neighbours(parents, children, keep):
+    """
+        Returns a function iterating over the neighbours of a key in the
+        moral graph of the ancestral set keep, without building that graph.
+        As keep is ancestral, all parents of its members are in keep.
+    """
+    def neighbours(key):
+        for p in parents(key):
+            yield p
+        for c in children(key):
+            if c in keep:
+                yield c
+                for p in parents(c):
+                    yield p
+    return neighbours
+
+
+def reach(parents, children, sources, nodes_z, ancestors_z, targets=None):
+    """
+        Core of the Bayes-ball traversal. Works on arbitrary hashable keys
+        so that it can be used for name based as well as integer based
+        graph representations.
+
+        Parameters
+        ----------
+        parents: callable
+            A function returning an iterable over the parents of a key.
+        children: callable
+            A function returning an iterable over the children of a key.
+        sources: iterable
+            The keys to start the traversal from.
+        nodes_z: set
+            The conditioned keys.
+        ancestors_z: set
+            The conditioned keys together with all their ancestors.
+        targets: set, optional
+            If given, the traversal stops as soon as any of these keys
+            has been reached.
+
+        Returns
+        -------
+        set
+            All keys that are connected to at least one of the sources by
+            an open path (including the sources themselves).
+    """
+    reached = set(sources)
+    if targets is not None and not reached.isdisjoint(targets):
+        return reached
+    with instrument.stage("reach"):
+        _traverse(parents, children, reached, nodes_z, ancestors_z, targets)
+    return reached
+
+
+def _traverse(parents, children, reached, nodes_z, ancestors_z, targets):
+    """
+        Runs the traversal of `reach`, adding all reached keys to reached.
+    """
+    # "up" holds nodes entered from one of their children, "down" nodes
+    # entered from one of their parents.
+    up = []
+    down = []
+    for s in reached:
+        up.extend(parents(s))
+        down.extend(children(s))
+    seen_up = set()
+    seen_down = set()
+    while up or down:
+        if up:
+            node = up.pop()
+            if node in seen_up:
+                continue
+            seen_up.add(node)
+            if node not in nodes_z:
+                up.extend(parents(node))
+                down.extend(children(node))
+        else:
+            node = down.pop()
+            if node in seen_down:
+                continue
+            seen_down.add(node)
+            if node not in nodes_z:
+                down.extend(children(node))
+            if node in ancestors_z:
+                up.extend(parents(node))
+        if node not in reached:
+            reached.add(node)
+            if targets is not None and node in targets:
+                break
+    if instrument.active is not None:
+        instrument.active.count("traversal_steps", len(seen_up) + len(seen_down))
+
+
+def shortest_open_path(dg, node_x, node_y, nodes_z):
+    """
+        Finds a shortest path between node_x and node_y that is open given
+        nodes_z, by a breadth first search over (node, direction) states.
+        The direction records whether a node was entered from one of its
+        children ("up") or from one of its parents ("down"), so that, as in
+        `reach`, every node is visited at most twice and the search costs
+        O(V+E). The search is restricted to the ancestors of node_x, node_y
+        and nodes_z, as no open path leaves them.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        node_x: ccbase.nodes.Node or String
+            The first end point of the path.
+        node_y: ccbase.nodes.Node or String
+            The second end point of the path.
+        nodes_z: iterable of ccbase.nodes.Node or String
+            The set of conditioned nodes.
+
+        Returns
+        -------
+        list of Strings or None
+            The node names of the path from node_x to node_y, or None if
+            the nodes are d-separated given nodes_z.
+
+        Raises
+        ----------
+        ValueError
+            If node_x or node_y is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    (source,) = _check_nodes(dg, (node_x,), index)
+    (target,) = _check_nodes(dg, (node_y,), index)
+    if source == target:
+        return [_name(node_x)]
+    z = _conditioning_keys(dg, nodes_z, index)
+    ancestors_z = ancestral_closure(parents, z)
+    keep = ancestral_closure(parents, (source, target), ancestors_z)
+    # Maps every visited (key, entered_from_child) state to the state it
+    # was reached from.
+    previous = {}
+    queue = deque()
+    for p in parents(source):
+        previous[p, True] = None
+        queue.append((p, True))
+    for c in children(source):
+        if c in keep:
+            previous[c, False] = None
+            queue.append((c, False))
+    found = None
+    while queue:
+        state = queue.popleft()
+        key, up = state
+        if key == target:
+            found = state
+            break
+        # The same rules as in reach: Non-colliders are open if they are
+        # not conditioned on, colliders if they are in ancestors_z.
+        successors = []
+        if key not in z:
+            successors.extend((c, False) for c in children(key) if c in keep)
+        if (up and key not in z) or (not up and key in ancestors_z):
+            successors.extend((p, True) for p in parents(key))
+        for nxt in successors:
+            if nxt not in previous and nxt[0] != source:
+                previous[nxt] = state
+                queue.append(nxt)
+    if instrument.active is not None:
+        instrument.active.count("traversal_steps", len(previous))
+    if found is None:
+        return None
+    path = []
+    while found is not None:
+        path.append(found[0])
+        found = previous[found]
+    path.append(source)
+    path.reverse()
+    if index is not None:
+        names = dg.names
+        return [names[k] for k in path]
+    return path
+
+
+def d_connected_nodes(dg, sources, nodes_z):
+    """
+        Computes all nodes that are connected to at least one of the
+        given sources by a path that is open given nodes_z.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        sources: iterable of ccbase.nodes.Node or String
+            The nodes to start from.
+        nodes_z: iterable of ccbase.nodes.Node or String
+            The set of conditioned nodes.
+
+        Returns
+        -------
+        set of Strings
+            The names of all reachable nodes, including the sources.
+    """
+    parents, children, index = _adjacency(dg)
+    sources = _check_nodes(dg, sources, index)
+    z = _conditioning_keys(dg, nodes_z, index)
+    reached = reach(parents, children, sources, z, ancestral_closure(parents, z))
+    if index is None:
+        return reached
+    return {dg.names[i] for i in reached}
+
+
+def d_separated(dg, nodes_x, nodes_y, nodes_z):
+    """
+        Checks whether all nodes in nodes_x are d-separated from all nodes
+        in nodes_y given nodes_z, using a single traversal starting from
+        all nodes in nodes_x at once.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        nodes_x: iterable of ccbase.nodes.Node or String
+            The first set of nodes.
+        nodes_y: iterable of ccbase.nodes.Node or String
+            The second set of nodes.
+        nodes_z: iterable of ccbase.nodes.Node or String
+            The set of conditioned nodes.
+
+        Returns
+        -------
+        bool
+            True if there is no open path between any node in nodes_x and
+            any node in nodes_y given nodes_z, False otherwise.
+
+        Raises
+        ----------
+        ValueError
+            If any node in nodes_x or nodes_y is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    sources = _check_nodes(dg, nodes_x, index)
+    targets = _check_nodes(dg, nodes_y, index)
+    if not sources or not targets:
+        return True
+    z = _conditioning_keys(dg, nodes_z, index)
+    return _pruned_separated(parents, children, sources, targets, z,
+                             ancestral_closure(parents, z))
+
+
+def _pruned_separated(parents, children, sources, targets, nodes_z, ancestors_z):
+    """
+        Checks whether the sources are d-separated from the targets with a
+        traversal that stops at the first target and does not leave the
+        ancestors of the sources, targets and nodes_z.
+    """
+    # Open paths can only pass through ancestors of nodes_x, nodes_y or
+    # nodes_z, so the traversal does not need to descend any further.
+    keep = ancestral_closure(parents, sources | targets, ancestors_z)
+    reached = reach(parents, lambda key: [c for c in children(key) if c in keep],
+                    sources, nodes_z, ancestors_z, targets)
+    return reached.isdisjoint(targets)
+
+
+def d_separated_moral(dg, nodes_x, nodes_y, nodes_z):
+    """
+        Checks whether all nodes in nodes_x are d-separated from all nodes
+        in nodes_y given nodes_z, by checking whether they are disconnected
+        in the moral graph of the ancestral subgraph of all three sets once
+        nodes_z are removed. Gives the same results as `d_separated`.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        nodes_x: iterable of ccbase.nodes.Node or String
+            The first set of nodes.
+        nodes_y: iterable of ccbase.nodes.Node or String
+            The second set of nodes.
+        nodes_z: iterable of ccbase.nodes.Node or String
+            The set of conditioned nodes.
+
+        Returns
+        -------
+        bool
+            True if there is no open path between any node in nodes_x and
+            any node in nodes_y given nodes_z, False otherwise.
+
+        Raises
+        ----------
+        ValueError
+            If any node in nodes_x or nodes_y is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    sources = _check_nodes(dg, nodes_x, index)
+    targets = _check_nodes(dg, nodes_y, index)
+    if not sources or not targets:
+        return True
+    if not sources.isdisjoint(targets):
+        return False
+    # End points never block a path, so they are not removed.
+    z = _conditioning_keys(dg, nodes_z, index) - sources - targets
+    keep = ancestral_closure(parents, sources | targets | z)
+    neighbours = _moral_neighbours(parents, children, keep)
+    with instrument.stage("moral connectivity"):
+        seen = set(sources)
+        stack = list(sources)
+        while stack:
+            for n in neighbours(stack.pop()):
+                if n in targets:
+                    return False
+                if n not in seen and n not in z:
+                    seen.add(n)
+                    stack.append(n)
+    if instrument.active is not None:
+        instrument.active.count("traversal_steps", len(seen))
+    return True
+
+
+class QueryContext(object):
+    """
+        Holds everything needed to answer d-separation queries with a fixed
+        conditioning set. Once a source has been queried repeatedly, the
+        nodes reachable from it are computed and reused for all further
+        queries starting from that source, see `ReachCache`.
+
+        Attributes
+        ----------
+        graph: ccbase.graph.Graph
+            The graph the queries refer to. It must not be changed while
+            the context is in use.
+        nodes_z: set
+            The keys of the conditioned nodes.
+        ancestors_z: set
+            The keys of the conditioned nodes and all their ancestors.
+        cache: ReachCache
+            The cache of the nodes reachable from each source, which may be
+            shared with other contexts.
+
+        The context can also check individual paths: A node on a path is a
+        collider if both of its neighbours on the path are among its
+        parents. Colliders are open if they are in ancestors_z, all other
+        nodes if they are not in nodes_z. The parent set of each node is
+        built once on first use, so that every check takes O(1).
+    """
+
+    def __init__(self, dg, nodes_z, cache=None):
+        self.graph = dg
+        self._parents, self._children, self._index = _adjacency(dg)
+        self.nodes_z = _conditioning_keys(dg, nodes_z, self._index)
+        self._ancestors_z = None
+        self.cache = ReachCache() if cache is None else cache
+        # Distinguishes the entries of this context in a shared cache.
+        self._token = object()
+        self._parent_sets = {}
+
+    @property
+    def ancestors_z(self):
+        # Only computed on first use, as checking paths without colliders
+        # does not require them.
+        if self._ancestors_z is None:
+            self._ancestors_z = ancestral_closure(self._parents, self.nodes_z)
+        return self._ancestors_z
+
+    def ancestral_subgraph(self, nodes):
+        """
+            Creates a view on the given nodes, the conditioned nodes and all
+            their ancestors, see `ancestral_subgraph`. Every path that is
+            open given the context's conditioning set and connects two of
+            the given nodes lies within this view.
+        """
+        keys = ancestral_closure(self._parents, _check_nodes(self.graph, nodes, self._index),
+                                 self.ancestors_z)
+        if self._index is not None:
+            names = self.graph.names
+            keys = [names[k] for k in keys]
+        return SubgraphView(self.graph, keys)
+
+    def _key(self, node):
+        """
+            Returns the key of the given node (object or name).
+
+            Raises
+            ----------
+            ValueError
+                If the node is not in the graph.
+        """
+        name = _name(node)
+        if name not in self.graph.nodes:
+            raise ValueError("The graph does not contain a node called {}".format(name))
+        return name if self._index is None else self._index[name]
+
+    def _parent_set(self, key):
+        try:
+            return self._parent_sets[key]
+        except KeyError:
+            res = self._parent_sets[key] = frozenset(self._parents(key))
+            return res
+
+    def is_blocked_key(self, prev, key, nxt):
+        """
+            Same as `is_blocked`, but takes the keys the context works on:
+            node names, or node ids for a `ccbase.frozen.FrozenGraph`.
+        """
+        parents = self._parent_set(key)
+        if prev in parents and nxt in parents:
+            return key not in self.ancestors_z
+        return key in self.nodes_z
+
+    def is_collider(self, prev, node, nxt):
+        """
+            Checks whether node is a collider on a path on which it lies
+            between prev and nxt, i.e. whether both are parents of node.
+        """
+        parents = self._parent_set(self._key(node))
+        return self._key(prev) in parents and self._key(nxt) in parents
+
+    def is_blocked(self, prev, node, nxt):
+        """
+            Checks whether a path on which node lies between prev and nxt
+            is blocked at node given the context's conditioning set.
+
+            Parameters
+            ----------
+            prev, node, nxt: String
+                The names of three consecutive nodes of the path. They are
+                not checked, as this is called for every step of a path
+                search.
+        """
+        index = self._index
+        if index is None:
+            return self.is_blocked_key(prev, node, nxt)
+        return self.is_blocked_key(index[prev], index[node], index[nxt])
+
+    def is_path_open(self, path):
+        """
+            Checks whether the given path is open given the context's
+            conditioning set. The end points of the path never block it.
+
+            Parameters
+            ----------
+            path: list of ccbase.nodes.Node or String
+                The nodes of an undirected path.
+
+            Returns
+            -------
+            bool
+                False if any node in between the end points blocks the
+                path, True otherwise.
+
+            Raises
+            ----------
+            ValueError
+                If any node of the path is not in the graph.
+        """
+        keys = [self._key(n) for n in path]
+        for i in range(1, len(keys) - 1):
+            if self.is_blocked_key(keys[i - 1], keys[i], keys[i + 1]):
+                return False
+        return True
+
+    def _reach_from(self, key):
+        """
+            Returns the cached keys reachable from the given source, or None
+            if the source has not been queried often enough yet.
+        """
+        cache = self.cache
+        cache_key = (self._token, key)
+        res = cache.get(cache_key)
+        if res is None and cache.seen(cache_key):
+            res = reach(self._parents, self._children, (key,), self.nodes_z,
+                        self.ancestors_z)
+            cache.put(cache_key, res)
+        return res
+
+    def d_separated(self, nodes_x, nodes_y):
+        """
+            Checks whether all nodes in nodes_x are d-separated from all
+            nodes in nodes_y given the context's conditioning set, see
+            `d_separated`. Sources without a cached reach set are checked
+            together by a pruned traversal.
+        """
+        sources = _check_nodes(self.graph, nodes_x, self._index)
+        targets = _check_nodes(self.graph, nodes_y, self._index)
+        if not sources or not targets:
+            return True
+        pending = set()
+        for key in sources:
+            reached = self._reach_from(key)
+            if reached is None:
+                pending.add(key)
+            elif not reached.isdisjoint(targets):
+                return False
+        if not pending:
+            return True
+        return _pruned_separated(self._parents, self._children, pending, targets,
+                                 self.nodes_z, self.ancestors_z)
+
+
+class ReachCache(object):
+    """
+        A least recently used cache of the keys reachable from single
+        sources, which can be shared by several `QueryContext` instances.
+        A source's reach set is only computed once the source has been
+        queried min_uses times. Until then, queries are answered faster by
+        a traversal that stops early and is pruned to the nodes relevant
+        to them.
+
+        Attributes
+        ----------
+        budget: int
+            The maximum total number of keys held by all cached reach sets.
+            Larger reach sets are not cached at all.
+        size: int
+            The total number of keys held by the cached reach sets.
+    """
+
+    # The number of queries of a source after which its reach set is
+    # computed, and the number of sources whose queries are counted.
+    min_uses = 4
+    history_size = 4096
+
+    def __init__(self, budget=REACH_CACHE_BUDGET):
+        self.budget = budget
+        self.size = 0
+        self._entries = OrderedDict()
+        self._history = OrderedDict()
+
+    def get(self, key):
+        """
+            Returns the cached reach set for the given key, or None.
+        """
+        entries = self._entries
+        if key not in entries:
+            return None
+        entries.move_to_end(key)
+        return entries[key]
+
+    def seen(self, key):
+        """
+            Counts a query of the given key and checks whether it has been
+            queried often enough (min_uses times) for its reach set to be
+            worth computing.
+        """
+        history = self._history
+        uses = history.pop(key, 0) + 1
+        if uses >= self.min_uses:
+            return True
+        history[key] = uses
+        if len(history) > self.history_size:
+            history.popitem(last=False)
+        return False
+
+    def put(self, key, reached):
+        """
+            Caches the given reach set, dropping the least recently used
+            ones to stay within the budget.
+        """
+        if len(reached) > self.budget:
+            return
+        entries = self._entries
+        entries[key] = reached
+        self.size += len(reached)
+        while self.size > self.budget:
+            self.size -= len(entries.popitem(last=False)[1])
+
+
+def as_context(dg, nodes_z):
+    """
+        Returns a `QueryContext` for the given conditioning set, or nodes_z
+        itself if it already is one.
+    """
+    if hasattr(nodes_z, "is_path_open"): #We check for an attribute, rather than a type.
+        return nodes_z
+    return QueryContext(dg, nodes_z)
+
+
+def d_separated_many(dg, queries, cache_size=128, budget=REACH_CACHE_BUDGET):
+    """
+        Answers a stream of d-separation queries against the same graph.
+        Queries with the same conditioning set share one `QueryContext`,
+        so the ancestors of the conditioning set are only computed once,
+        and the nodes reachable from sources that are queried repeatedly
+        are cached.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        queries: iterable of (nodes_x, nodes_y, nodes_z) tuples
+            The queries, see `d_separated`. May be any iterable, including
+            a generator, and is consumed lazily.
+        cache_size: int, optional (Default:128)
+            The maximum number of conditioning sets whose contexts are kept.
+        budget: int, optional (Default:REACH_CACHE_BUDGET)
+            The maximum total number of nodes held by the cached reach sets
+            of all contexts, see `ReachCache`.
+
+        Yields
+        --------
+        bool
+            The result of `d_separated` for each query, in input order.
+    """
+    cache = ReachCache(budget)
+    contexts = OrderedDict()
+    for nodes_x, nodes_y, nodes_z in queries:
+        key = frozenset(map(_name, nodes_z))
+        context = contexts.get(key)
+        if context is None:
+            context = QueryContext(dg, key, cache)
+            contexts[key] = context
+            if len(contexts) > cache_size:
+                contexts.popitem(last=False)
+        else:
+            contexts.move_to_end(key)
+        yield context.d_separated(nodes_x, nodes_y)
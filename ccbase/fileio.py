@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming readers that build a `ccbase.graph.Graph` from files. The input
+is processed in chunks of a fixed number of lines, each of which is added
+to the graph with `ccbase.graph.Graph.add_edges_from`, so the memory needed
+besides the graph itself does not depend on the size of the file.
+
+Node names are interned while parsing, so that repeated occurrences of the
+same name in a file share a single string object.
+
+Besides these text formats, graphs can be stored in a compact binary
+format (see `save_binary`), which can be memory mapped when loading.
+"""
+
+import csv
+import json
+import mmap as mmap_module
+import struct
+import sys
+from array import array
+
+from .frozen import FrozenGraph, INDPTR_TYPE, INDICES_TYPE, np
+from .graph import Graph
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _open(source):
+    """
+        Opens the given path for reading, or returns the given object if it
+        already is an open file (or any other iterable over lines).
+    """
+    if hasattr(source, "read"):
+        return source
+    return open(source, "r", encoding="utf-8", newline="")
+
+
+def _add_chunks(records, graph, chunk_size):
+    """
+        Adds the given records to the graph in chunks. A record is either a
+        (node_a, node_b) edge or a 1-tuple holding a single node.
+    """
+    if graph is None:
+        graph = Graph()
+    edges = []
+    for record in records:
+        if len(record) == 1:
+            if record[0] not in graph.nodes:
+                graph.add_node(record[0])
+            continue
+        edges.append(record)
+        if len(edges) >= chunk_size:
+            graph.add_edges_from(edges)
+            edges = []
+    graph.add_edges_from(edges)
+    return graph
+
+
+def iter_edgelist(source, delimiter=None, comments="#"):
+    """
+        Parses an edge list file containing one "node_a node_b" edge per
+        line. Lines with a single field add an isolated node, empty lines
+        and lines starting with the comment string are skipped.
+
+        Parameters
+        ----------
+        source: String or file
+            The path of the file or an open file.
+        delimiter: String, optional
+            The field delimiter. Defaults to any whitespace.
+        comments: String, optional (Default:"#")
+            The prefix of comment lines.
+
+        Yields
+        --------
+        tuple of Strings
+            (node_a, node_b) for every edge and (node,) for isolated nodes.
+    """
+    intern = sys.intern
+    f = _open(source)
+    try:
+        for line in f:
+            line = line.strip()
+            if not line or (comments and line.startswith(comments)):
+                continue
+            fields = line.split(delimiter)
+            if len(fields) == 1:
+                yield (intern(fields[0].strip()),)
+            else:
+                yield intern(fields[0].strip()), intern(fields[1].strip())
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_edgelist(source, delimiter=None, comments="#", graph=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Reads an edge list file, see `iter_edgelist`.
+
+        Parameters
+        ----------
+        source: String or file
+            The path of the file or an open file.
+        delimiter: String, optional
+            The field delimiter. Defaults to any whitespace.
+        comments: String, optional (Default:"#")
+            The prefix of comment lines.
+        graph: ccbase.graph.Graph, optional
+            The graph to add the edges to. A new graph is created if omitted.
+        chunk_size: int, optional
+            The number of edges that are added to the graph at once.
+
+        Returns
+        -------
+        ccbase.graph.Graph
+            The graph containing all nodes and edges of the file.
+    """
+    return _add_chunks(iter_edgelist(source, delimiter, comments), graph, chunk_size)
+
+
+def iter_csv(source, source_column=0, target_column=1, header=True, **fmtparams):
+    """
+        Parses a CSV file containing one edge per row.
+
+        Parameters
+        ----------
+        source: String or file
+            The path of the file or an open file.
+        source_column, target_column: int or String, optional
+            The columns holding the first and the second node of an edge,
+            either as index or, if the file has a header, as column name.
+        header: Bool, optional (Default:True)
+            Whether the first row is a header.
+        **fmtparams:
+            Further formatting parameters passed to `csv.reader`.
+
+        Yields
+        --------
+        tuple of Strings
+            (node_a, node_b) for every edge. Rows with an empty target add
+            an isolated node.
+    """
+    intern = sys.intern
+    f = _open(source)
+    try:
+        reader = csv.reader(f, **fmtparams)
+        if header:
+            names = next(reader, [])
+            if not isinstance(source_column, int):
+                source_column = names.index(source_column)
+            if not isinstance(target_column, int):
+                target_column = names.index(target_column)
+        for row in reader:
+            if not row:
+                continue
+            node_a = row[source_column].strip()
+            node_b = row[target_column].strip() if len(row) > target_column else ""
+            if node_b:
+                yield intern(node_a), intern(node_b)
+            else:
+                yield (intern(node_a),)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_csv(source, source_column=0, target_column=1, header=True, graph=None,
+             chunk_size=DEFAULT_CHUNK_SIZE, **fmtparams):
+    """
+        Reads a CSV file containing one edge per row, see `iter_csv`.
+
+        Returns
+        -------
+        ccbase.graph.Graph
+            The graph containing all nodes and edges of the file.
+    """
+    return _add_chunks(iter_csv(source, source_column, target_column, header, **fmtparams),
+                       graph, chunk_size)
+
+
+def iter_jsonl(source, source_key="source", target_key="target"):
+    """
+        Parses a JSON lines file, containing one JSON value per line. Each
+        value is either an object holding the nodes of an edge under the
+        given keys, a [node_a, node_b] list, or a single node name.
+
+        Parameters
+        ----------
+        source: String or file
+            The path of the file or an open file.
+        source_key, target_key: String, optional
+            The keys holding the first and the second node of an edge.
+
+        Yields
+        --------
+        tuple
+            (node_a, node_b) for every edge and (node,) for isolated nodes.
+    """
+    f = _open(source)
+    try:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            value = json.loads(line)
+            if isinstance(value, dict):
+                if value.get(target_key) is None:
+                    yield (_intern(value[source_key]),)
+                else:
+                    yield _intern(value[source_key]), _intern(value[target_key])
+            elif isinstance(value, list):
+                yield tuple(_intern(v) for v in value[:2])
+            else:
+                yield (_intern(value),)
+    finally:
+        if f is not source:
+            f.close()
+
+
+def read_jsonl(source, source_key="source", target_key="target", graph=None,
+               chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Reads a JSON lines file, see `iter_jsonl`.
+
+        Returns
+        -------
+        ccbase.graph.Graph
+            The graph containing all nodes and edges of the file.
+    """
+    return _add_chunks(iter_jsonl(source, source_key, target_key), graph, chunk_size)
+
+
+def iter_queries(source):
+    """
+        Parses a JSON lines file of independence queries. Each line holds
+        either an object with the keys "x", "y" and "z" (where "z" may be
+        omitted) or a [nodes_x, nodes_y, nodes_z] list.
+
+        Parameters
+        ----------
+        source: String or file
+            The path of the file or an open file.
+
+        Yields
+        --------
+        tuple
+            A (nodes_x, nodes_y, nodes_z) tuple of lists for every query,
+            as expected by `ccbase.dsep.d_separated_many`.
+    """
+    f = _open(source)
+    try:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            value = json.loads(line)
+            if isinstance(value, dict):
+                yield value["x"], value["y"], value.get("z", [])
+            else:
+                yield value[0], value[1], value[2] if len(value) > 2 else []
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _intern(value):
+    """
+        Interns strings, all other values are returned unchanged.
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+# Binary graph files consist of a fixed size header, followed by the name
+# table (num_nodes+1 int64 offsets into a UTF-8 blob) and the parent and
+# children CSR arrays of a `ccbase.frozen.FrozenGraph`. All integers are
+# stored in little endian byte order and every section starts at a multiple
+# of 8 bytes, so that the arrays can be used directly from a memory map.
+MAGIC = b"CCBG"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIQQQ")  # magic, version, nodes, edges, name bytes
+
+
+def _padding(size):
+    return -size % 8
+
+
+def _to_bytes(values, typecode):
+    """
+        Returns the little endian bytes of the given integer array.
+    """
+    if np is not None:
+        return np.asarray(values, dtype="<" + typecode).tobytes()
+    res = array(typecode, values)
+    if sys.byteorder == "big":
+        res.byteswap()
+    return res.tobytes()
+
+
+def _from_buffer(buf, offset, count, typecode):
+    """
+        Returns an array of count integers, stored at the given offset of
+        the buffer, without copying them if possible.
+    """
+    if np is not None:
+        return np.frombuffer(buf, dtype="<" + typecode, count=count, offset=offset)
+    size = array(typecode).itemsize
+    view = memoryview(buf)[offset:offset + count * size].cast(typecode)
+    if sys.byteorder == "big":
+        view = array(typecode, view)
+        view.byteswap()
+    return view
+
+
+class NameTable(object):
+    """
+        A read-only sequence of the node names stored in a binary graph
+        file. Names are only decoded when they are accessed.
+    """
+
+    def __init__(self, buf, offsets, start):
+        self._buf = buf
+        self._offsets = offsets
+        self._start = start
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("name index out of range")
+        start = self._start
+        return str(self._buf[start + self._offsets[i]:start + self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        buf = self._buf
+        start = self._start
+        offsets = self._offsets.tolist()
+        for i in range(len(offsets) - 1):
+            yield str(buf[start + offsets[i]:start + offsets[i + 1]], "utf-8")
+
+
+def save_binary(graph, path):
+    """
+        Stores the given graph in a compact binary file, which can be
+        loaded (and memory mapped) with `load_binary`.
+
+        Parameters
+        ----------
+        graph: ccbase.graph.Graph or ccbase.frozen.FrozenGraph
+            The graph to store. All node names need to be strings.
+        path: String
+            The path of the file to write.
+
+        Raises
+        ----------
+        TypeError
+            If any node name is not a string.
+    """
+    frozen = graph.freeze()
+    offsets = array(INDPTR_TYPE, [0])
+    blob = bytearray()
+    for name in frozen.names:
+        if not isinstance(name, str):
+            raise TypeError("Only graphs with string node names can be stored, " \
+                            "got {!r}".format(name))
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+    blob += b"\0" * _padding(len(blob))
+    num_nodes = frozen.num_nodes
+    num_edges = frozen.num_edges
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, num_nodes, num_edges, len(blob)))
+        f.write(_to_bytes(offsets, INDPTR_TYPE))
+        f.write(blob)
+        for indptr, indices in ((frozen.parent_indptr, frozen.parent_indices),
+                                (frozen.child_indptr, frozen.child_indices)):
+            f.write(_to_bytes(indptr, INDPTR_TYPE))
+            data = _to_bytes(indices, INDICES_TYPE)
+            f.write(data)
+            f.write(b"\0" * _padding(len(data)))
+
+
+def load_binary(path, mmap=True):
+    """
+        Loads a graph stored with `save_binary`.
+
+        Parameters
+        ----------
+        path: String
+            The path of the file to read.
+        mmap: Bool, optional (Default:True)
+            If true, the file is memory mapped rather than read. The arrays
+            of the returned graph then directly refer to the mapped file,
+            so loading takes constant time and processes loading the same
+            file share its pages. Pickling such a graph only transfers the
+            path of the file.
+
+        Returns
+        -------
+        ccbase.frozen.FrozenGraph
+            The loaded graph.
+
+        Raises
+        ----------
+        ValueError
+            If the file is not a binary graph file.
+    """
+    with open(path, "rb") as f:
+        if mmap:
+            buf = mmap_module.mmap(f.fileno(), 0, access=mmap_module.ACCESS_READ)
+        else:
+            buf = f.read()
+    if len(buf) < _HEADER.size:
+        raise ValueError("{} is not a binary graph file".format(path))
+    magic, version, num_nodes, num_edges, name_bytes = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("{} is not a binary graph file of version {}".format(path, FORMAT_VERSION))
+    offset = _HEADER.size
+    name_offsets = _from_buffer(buf, offset, num_nodes + 1, INDPTR_TYPE)
+    offset += 8 * (num_nodes + 1)
+    names = NameTable(buf, name_offsets, offset)
+    offset += name_bytes
+    arrays = []
+    for _ in range(2):
+        arrays.append(_from_buffer(buf, offset, num_nodes + 1, INDPTR_TYPE))
+        offset += 8 * (num_nodes + 1)
+        arrays.append(_from_buffer(buf, offset, num_edges, INDICES_TYPE))
+        offset += 4 * num_edges + _padding(4 * num_edges)
+    res = FrozenGraph(names, *arrays)
+    if mmap:
+        res.path = path
+    return res
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact, immutable graphs. A frozen graph interns every node name to an
+integer id and stores the parents and children of all nodes as two
+compressed sparse row (CSR) structures: an "indptr" array of length
+num_nodes+1 and an "indices" array holding the neighbour ids, so that
+the neighbours of node i are indices[indptr[i]:indptr[i+1]].
+
+NumPy arrays are used if NumPy is installed, otherwise the arrays of the
+standard library `array` module are used.
+"""
+
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .views import ExcludingView, SubgraphView, UndirectedView
+
+# Typecodes (and the corresponding NumPy dtypes) of the CSR arrays.
+INDPTR_TYPE = "q"
+INDICES_TYPE = "i"
+
+
+def int_array(values, typecode):
+    """
+        Converts the given integers into an array of the given typecode,
+        using NumPy if available.
+    """
+    if np is not None:
+        return np.asarray(values, dtype=np.dtype(typecode))
+    if isinstance(values, (array, memoryview)) and \
+            getattr(values, "typecode", getattr(values, "format", None)) == typecode:
+        return values
+    return array(typecode, values)
+
+
+def _diff(indptr):
+    """
+        Returns the differences between consecutive entries of a CSR indptr
+        array, i.e. the number of neighbours of each node.
+    """
+    if np is not None:
+        return np.diff(indptr)
+    return array(INDPTR_TYPE, [indptr[i + 1] - indptr[i] for i in range(len(indptr) - 1)])
+
+
+class FrozenGraph(object):
+    """
+        An immutable graph that holds its edges in integer CSR arrays.
+        Use `ccbase.graph.Graph.freeze` to create one.
+
+        Attributes
+        ----------
+        names: sequence
+            The node names, indexed by node id.
+        index: dict
+            A dictionary containing node-name:id pairs for all nodes. It is
+            only built on first access.
+        parent_indptr, parent_indices: array
+            The CSR arrays holding the parent ids of each node.
+        child_indptr, child_indices: array
+            The CSR arrays holding the children ids of each node.
+        is_directed: bool
+            Always True.
+        path: String
+            The file the graph was loaded from with `load`, or None.
+    """
+
+    def __init__(self, names, parent_indptr, parent_indices, child_indptr,
+                 child_indices, index=None):
+        self.names = names
+        self._index = index
+        self.parent_indptr = int_array(parent_indptr, INDPTR_TYPE)
+        self.parent_indices = int_array(parent_indices, INDICES_TYPE)
+        self.child_indptr = int_array(child_indptr, INDPTR_TYPE)
+        self.child_indices = int_array(child_indices, INDICES_TYPE)
+        if np is not None:
+            for arr in (self.parent_indptr, self.parent_indices,
+                        self.child_indptr, self.child_indices):
+                arr.flags.writeable = False
+        self.is_directed = True
+        self.path = None
+        # Cached (order, ranks) pair, see _topological_sort.
+        self._topology = None
+
+    def __reduce__(self):
+        """
+            Graphs loaded from a file are pickled by their path, so that
+            other processes map the same file instead of receiving a copy.
+        """
+        if self.path is not None:
+            from .fileio import load_binary
+            return load_binary, (self.path, True)
+        arrays = tuple(array(a.format, a) if isinstance(a, memoryview) else a
+                       for a in (self.parent_indptr, self.parent_indices,
+                                 self.child_indptr, self.child_indices))
+        return FrozenGraph, (list(self.names),) + arrays
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+            Loads a graph stored with `save`, see `ccbase.fileio.load_binary`.
+        """
+        from .fileio import load_binary
+        return load_binary(path, mmap)
+
+    def save(self, path):
+        """
+            Stores the graph in a compact binary file, see
+            `ccbase.fileio.save_binary`.
+        """
+        from .fileio import save_binary
+        save_binary(self, path)
+
+    @property
+    def index(self):
+        """
+            The node-name:id dictionary.
+        """
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.names)}
+        return self._index
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+            Creates a frozen copy of the given graph.
+
+            Parameters
+            ----------
+            graph: ccbase.graph.Graph
+                The graph to freeze.
+
+            Returns
+            -------
+            FrozenGraph
+                A frozen graph containing the same nodes and edges.
+        """
+        names = list(graph.nodes)
+        index = {n: i for i, n in enumerate(names)}
+        arrays = []
+        for neighbours in (graph.iter_parents, graph.iter_children):
+            indptr = array(INDPTR_TYPE, [0])
+            indices = array(INDICES_TYPE)
+            for n in names:
+                indices.extend([index[m] for m in neighbours(n)])
+                indptr.append(len(indices))
+            arrays.extend((indptr, indices))
+        return cls(names, *arrays, index=index)
+
+    @property
+    def nodes(self):
+        """
+            The node-name:id mapping. It allows the same membership tests
+            and iteration over node names as `ccbase.graph.Graph.nodes`.
+        """
+        return self.index
+
+    def get_number_of_nodes(self):
+        """
+            Returns
+            -------
+            int
+                The total number of nodes in the graph.
+        """
+        return len(self.names)
+
+    @property
+    def num_nodes(self):
+        """
+            Performs the same as "get_number_of_nodes" but as a property.
+        """
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        """
+            The total number of edges in the graph.
+        """
+        return len(self.child_indices)
+
+    def node_id(self, node):
+        """
+            Returns the integer id of the given node.
+
+            Raises
+            ----------
+            ValueError
+                If the specified node is not in the graph.
+        """
+        try:
+            return self.index[getattr(node, "name", node)]
+        except KeyError:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def parent_ids(self, i):
+        """
+            Returns a list of the parent ids of the node with id i.
+        """
+        ptr = self.parent_indptr
+        return self.parent_indices[ptr[i]:ptr[i + 1]].tolist()
+
+    def child_ids(self, i):
+        """
+            Returns a list of the children ids of the node with id i.
+        """
+        ptr = self.child_indptr
+        return self.child_indices[ptr[i]:ptr[i + 1]].tolist()
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the parents of the given node.
+        """
+        names = self.names
+        return (names[i] for i in self.parent_ids(self.node_id(node)))
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the children of the given node.
+        """
+        names = self.names
+        return (names[i] for i in self.child_ids(self.node_id(node)))
+
+    def get_parents(self, node, return_names=True):
+        """
+            Collects and returns all parents of the given node. Since frozen
+            graphs do not hold node objects, the parent ids are returned if
+            return_names is False.
+        """
+        ids = self.parent_ids(self.node_id(node))
+        if return_names:
+            return [self.names[i] for i in ids]
+        return ids
+
+    def get_children(self, node, return_names=True):
+        """
+            Collects and returns all children of the given node. Since frozen
+            graphs do not hold node objects, the children ids are returned if
+            return_names is False.
+        """
+        ids = self.child_ids(self.node_id(node))
+        if return_names:
+            return [self.names[i] for i in ids]
+        return ids
+
+    def in_degrees(self):
+        """
+            Returns an array holding the number of parents of each node,
+            indexed by node id.
+        """
+        return _diff(self.parent_indptr)
+
+    def out_degrees(self):
+        """
+            Returns an array holding the number of children of each node,
+            indexed by node id.
+        """
+        return _diff(self.child_indptr)
+
+    def in_degree(self, node):
+        """
+            Returns the number of parents of the given node.
+        """
+        i = self.node_id(node)
+        return int(self.parent_indptr[i + 1] - self.parent_indptr[i])
+
+    def out_degree(self, node):
+        """
+            Returns the number of children of the given node.
+        """
+        i = self.node_id(node)
+        return int(self.child_indptr[i + 1] - self.child_indptr[i])
+
+    def iter_degrees(self):
+        """
+            Iterates over (node name, number of parents, number of children)
+            tuples for all nodes.
+        """
+        return zip(self.names, self.in_degrees().tolist(), self.out_degrees().tolist())
+
+    def _closure(self, neighbours, start):
+        res = set()
+        stack = [start]
+        while stack:
+            for m in neighbours(stack.pop()):
+                if m not in res:
+                    res.add(m)
+                    stack.append(m)
+        return res
+
+    def get_ancestors(self, node):
+        """
+            Returns
+            -------
+            set
+                A set containing the names of all ancestors of the specified node.
+        """
+        ids = self._closure(self.parent_ids, self.node_id(node))
+        return {self.names[i] for i in ids}
+
+    def get_descendants(self, node):
+        """
+            Returns
+            -------
+            set
+                A set containing the names of all descendants of the specified node.
+        """
+        ids = self._closure(self.child_ids, self.node_id(node))
+        return {self.names[i] for i in ids}
+
+    def _topological_sort(self):
+        """
+            Computes (and caches) a topological order of the node ids with
+            Kahn's algorithm, together with the rank of each id in that
+            order. Both are None if the graph contains a cycle.
+        """
+        if self._topology is not None:
+            return self._topology
+        in_degree = self.in_degrees().tolist()
+        queue = deque(i for i, d in enumerate(in_degree) if d == 0)
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for c in self.child_ids(i):
+                in_degree[c] -= 1
+                if in_degree[c] == 0:
+                    queue.append(c)
+        if len(order) < len(self.names):
+            self._topology = (None, None)
+        else:
+            ranks = [0] * len(order)
+            for rank, i in enumerate(order):
+                ranks[i] = rank
+            order, ranks = int_array(order, INDICES_TYPE), int_array(ranks, INDICES_TYPE)
+            if np is not None:
+                order.flags.writeable = ranks.flags.writeable = False
+            self._topology = (order, ranks)
+        return self._topology
+
+    def is_acyclic(self):
+        """
+            Checks whether the graph does not contain a directed cycle, see
+            `ccbase.graph.Graph.is_acyclic`.
+        """
+        return self._topological_sort()[0] is not None
+
+    def topological_order(self):
+        """
+            Returns the node names in topological order, see
+            `ccbase.graph.Graph.topological_order`.
+
+            Raises
+            ----------
+            ValueError
+                If the graph contains a cycle.
+        """
+        order = self._topological_sort()[0]
+        if order is None:
+            raise ValueError("The graph contains a cycle")
+        names = self.names
+        return [names[i] for i in order.tolist()]
+
+    def topological_ranks(self):
+        """
+            Returns the position of every node in `topological_order`.
+
+            Returns
+            -------
+            array
+                The rank of each node, indexed by node id.
+
+            Raises
+            ----------
+            ValueError
+                If the graph contains a cycle.
+        """
+        ranks = self._topological_sort()[1]
+        if ranks is None:
+            raise ValueError("The graph contains a cycle")
+        return ranks
+
+    def is_ancestor(self, node_a, node_b):
+        """
+            Checks if node_a is an ancestor of node_b. Once the topological
+            order has been computed, node_a is only searched for if it is
+            ranked before node_b.
+        """
+        id_a, id_b = self.node_id(node_a), self.node_id(node_b)
+        ranks = self._topology[1] if self._topology is not None else None
+        if ranks is not None and ranks[id_a] >= ranks[id_b]:
+            return False
+        return id_a in self._closure(self.parent_ids, id_b)
+
+    def is_descendant(self, node_a, node_b):
+        """
+            Checks if node_a is a descendant of node_b.
+        """
+        return self.is_ancestor(node_b, node_a)
+
+    def to_undirected(self, as_view=True):
+        """
+            Returns an undirected `ccbase.views.UndirectedView` of this graph.
+        """
+        return UndirectedView(self)
+
+    def reverse(self, as_view=True):
+        """
+            Returns a frozen graph with all edges reversed. The CSR arrays
+            are shared with this graph rather than copied.
+        """
+        return FrozenGraph(self.names, self.child_indptr, self.child_indices,
+                           self.parent_indptr, self.parent_indices, index=self._index)
+
+    def markov_blanket(self, node):
+        """
+            Returns the names of the Markov blanket of the given node, see
+            `ccbase.blankets.markov_blanket`.
+        """
+        from .blankets import markov_blanket
+        return markov_blanket(self, node)
+
+    def markov_blankets(self, as_matrix=False):
+        """
+            Returns the Markov blankets of all nodes, see
+            `ccbase.blankets.markov_blankets`. With NumPy, they are computed
+            with vectorized operations on the CSR arrays. The rows of the
+            matrix returned for as_matrix=True are indexed by node id.
+        """
+        from .blankets import markov_blankets
+        return markov_blankets(self, as_matrix)
+
+    def subgraph(self, nodes):
+        """
+            Returns a view on the subgraph induced by the given nodes, see
+            `ccbase.graph.Graph.subgraph`.
+        """
+        return SubgraphView(self, nodes)
+
+    def without(self, nodes):
+        """
+            Returns a view on this graph without the given nodes, see
+            `ccbase.graph.Graph.without`.
+        """
+        return ExcludingView(self, nodes)
+
+    def freeze(self):
+        """
+            Frozen graphs are already immutable, so this returns the graph itself.
+        """
+        return self
+
+    def thaw(self):
+        """
+            Creates a mutable `ccbase.graph.Graph` with the same nodes and edges.
+        """
+        from .graph import Graph
+        res = Graph()
+        for n in self.names:
+            res.add_node(n)
+        names = self.names
+        for i in range(len(names)):
+            for j in self.child_ids(i):
+                res.add_edge(names[i], names[j])
+        return res
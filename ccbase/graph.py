@@ -7,8 +7,56 @@ Refactored module for holding graphical networks.
 """
 
 import copy
+import weakref
+from collections import OrderedDict, deque
 # A relative import of another module from the same package:
+from . import blankets, dsep, instrument
 from .nodes import Node
+from .views import ExcludingView, ReversedView, SubgraphView, UndirectedView
+from .frozen import FrozenGraph
+
+# The number of changes kept in the change log of a graph, see
+# Graph.changes_since.
+CHANGE_LOG_SIZE = 1024
+
+# The maximum total number of nodes held by the cached ancestor/descendant
+# closures of a graph, see Graph._closure.
+CLOSURE_CACHE_BUDGET = 1000000
+
+
+def _copy_node(node, memo=None):
+    """
+        Copies a node without its edges. Nodes of subclasses are deep
+        copied apart from their edges.
+    """
+    if type(node) is Node:
+        return Node(node.name)
+    if memo is None:
+        memo = {}
+    # Keeps deepcopy from following the edges.
+    memo[id(node.parents)] = memo[id(node.children)] = None
+    try:
+        return copy.deepcopy(node, memo)
+    finally:
+        memo.pop(id(node.parents), None)
+        memo.pop(id(node.children), None)
+
+
+def _copy_nodes(nodes, memo=None):
+    """
+        Copies a node-name:`ccbase.nodes.Node` dictionary without following
+        the edges recursively: all nodes are copied first, then the parents
+        and children of every copy are looked up among the copies.
+    """
+    if memo is None:
+        memo = {}
+    res = {name: _copy_node(node, memo) for name, node in nodes.items()}
+    for name, node in nodes.items():
+        new = res[name]
+        new.parents = {p: res[p] for p in node.parents}
+        new.children = {c: res[c] for c in node.children}
+    return res
+
 
 class Graph(object):
     """
@@ -18,12 +66,36 @@ class Graph(object):
             A dictionary containing node-name:`ccbase.nodes.Node` pairs for all nodes in the graph.
         is_directed: bool, defaults to True
             A boolean indicating if the graph is a directed graph.
+        version: int
+            A counter that is incremented with every change of the graph's
+            structure, see `changes_since`.
 
     """
     
     def __init__(self):
         self.nodes = {}
         self.is_directed = True
+        # Cached ancestor/descendant closures, see _closure and _invalidate.
+        self._closures = OrderedDict()
+        self._closure_size = 0
+        # Cached (order, ranks) pair, see _topology.
+        self._topology = None
+        # Number of parents/children of each node, kept up to date by the
+        # methods adding or removing nodes and edges.
+        self._in_degree = {}
+        self._out_degree = {}
+        self.version = 0
+        # (version, change) pairs of the most recent changes, see _invalidate.
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+        # Weak set of all graphs that share their nodes after a
+        # copy-on-write copy, or None, see _unshare.
+        self._shared = None
+        # Names of the nodes the graph has copied for itself while it
+        # shares the others, or None, see _unshare.
+        self._owned = None
+        # Weak set of all graphs that share their nodes after a shallow
+        # copy, or None, see _invalidate.
+        self._peers = None
         
     def add_node(self, node):
         """
@@ -38,11 +110,22 @@ class Graph(object):
         """
         if node in self.nodes:
             raise ValueError("The graph already contains a node named {}".format(node))
+        self._unshare()
         
         try:
             self.nodes[node.name] = node
         except AttributeError: #We check for an attribute, rather than a type.
-            self.nodes[node] = Node(node)
+            node = Node(node)
+            self.nodes[node.name] = node
+        if self._owned is not None:
+            self._owned.add(node.name)
+        self._in_degree[node.name] = len(node.parents)
+        self._out_degree[node.name] = len(node.children)
+        if node.parents or node.children:
+            # The node brings edges to other nodes along.
+            self._invalidate()
+        else:
+            self._invalidate(("add_node", node.name, None))
         
     def remove_node(self, node):
         """
@@ -60,9 +143,24 @@ class Graph(object):
         """
         if not node in self.nodes:
             raise ValueError("The graph does not contain a node named {}".format(node))
+        tmp_node = self.nodes[node]
+        self._unshare(tmp_node.name, *tmp_node.parents, *tmp_node.children)
         
-        self.nodes[node].destroy()
+        # The neighbours are looked up by name, see _unshare.
+        nodes = self.nodes
+        tmp_node = nodes[node]
+        for p in tmp_node.parents:
+            self._out_degree[p] -= 1
+            nodes[p].remove_child(tmp_node)
+        for c in tmp_node.children:
+            self._in_degree[c] -= 1
+            nodes[c].remove_parent(tmp_node)
+        tmp_node.parents = {}
+        tmp_node.children = {}
         del self.nodes[node]
+        del self._in_degree[node]
+        del self._out_degree[node]
+        self._invalidate(("remove_node", node, None))
         
     def add_edge(self, node_a, node_b):
         """
@@ -84,11 +182,22 @@ class Graph(object):
                 If any of the specified nodes are not in the graph.
         """
         try:
-            self.nodes[node_a].add_child(self.nodes[node_b])
-            self.nodes[node_b].add_parent(self.nodes[node_a])
+            tmp_a = self.nodes[node_a]
+            tmp_b = self.nodes[node_b]
         except KeyError:
             raise ValueError("At least one of your specified nodes ({},{}) " \
                              "is not contained in the graph".format(node_a, node_b))
+        if tmp_b.name in tmp_a.children:
+            return
+        if self._shared is not None:
+            self._unshare(tmp_a.name, tmp_b.name)
+            tmp_a = self.nodes[tmp_a.name]
+            tmp_b = self.nodes[tmp_b.name]
+        self._out_degree[tmp_a.name] += 1
+        self._in_degree[tmp_b.name] += 1
+        tmp_a.add_child(tmp_b)
+        tmp_b.add_parent(tmp_a)
+        self._invalidate(("add_edge", tmp_a.name, tmp_b.name))
             
             
     def remove_edge(self, node_a, node_b):
@@ -105,13 +214,134 @@ class Graph(object):
                 The name of the second node.
         """
         try:
-            self.nodes[node_a].remove_child(self.nodes[node_b])
-            self.nodes[node_b].remove_parent(self.nodes[node_a])
+            tmp_a = self.nodes[node_a]
+            tmp_b = self.nodes[node_b]
         except KeyError:
             raise ValueError("At least one of your specified nodes ({},{}) " \
                              "is not contained in the graph".format(node_a, node_b))
+        if tmp_b.name not in tmp_a.children:
+            return
+        if self._shared is not None:
+            self._unshare(tmp_a.name, tmp_b.name)
+            tmp_a = self.nodes[tmp_a.name]
+            tmp_b = self.nodes[tmp_b.name]
+        self._out_degree[tmp_a.name] -= 1
+        self._in_degree[tmp_b.name] -= 1
+        tmp_a.remove_child(tmp_b)
+        tmp_b.remove_parent(tmp_a)
+        self._invalidate(("remove_edge", tmp_a.name, tmp_b.name))
             
             
+    @classmethod
+    def from_edges(cls, edges, nodes=None):
+        """
+            Creates a new graph from the given edges in one go, see
+            `add_edges_from`.
+
+            Parameters
+            ----------
+            edges: iterable of (String, String) tuples
+                The directed edges of the new graph. Nodes that appear in
+                the edges are created automatically.
+            nodes: iterable of String or `ccbase.nodes.Node`, optional
+                Additional nodes, e.g. nodes without any edges.
+
+            Returns
+            -------
+            Graph
+                The new graph.
+        """
+        res = cls()
+        if nodes is not None:
+            res.add_nodes_from(nodes)
+        res.add_edges_from(edges)
+        return res
+
+    def add_nodes_from(self, nodes):
+        """
+            Adds all given nodes to the graph, see `add_node`.
+
+            Parameters
+            ----------
+            nodes: iterable of String or `ccbase.nodes.Node`
+                The names of the new nodes or the new nodes directly.
+
+            Raises
+            ----------
+            ValueError
+                If the graph already contains one of the nodes. All nodes
+                before it are added.
+        """
+        self._unshare()
+        graph_nodes = self.nodes
+        owned = self._owned
+        try:
+            for node in nodes:
+                if node in graph_nodes:
+                    raise ValueError("The graph already contains a node named {}".format(node))
+                if not hasattr(node, "name"):
+                    node = Node(node)
+                graph_nodes[node.name] = node
+                if owned is not None:
+                    owned.add(node.name)
+                self._in_degree[node.name] = len(node.parents)
+                self._out_degree[node.name] = len(node.children)
+        finally:
+            # The nodes added before an error remain in the graph.
+            self._invalidate()
+
+    def add_edges_from(self, edges):
+        """
+            Adds all given directed edges to the graph. Unlike `add_edge`,
+            nodes that are not yet contained in the graph are created, so
+            that large edge lists can be added without any per-edge
+            exception handling.
+
+            Parameters
+            ----------
+            edges: iterable of (String, String) tuples
+                The (node_a, node_b) name pairs, each representing an edge
+                from node_a to node_b.
+
+            Raises
+            ----------
+            ValueError
+                If an edge is not a pair. All edges before it are added.
+        """
+        self._unshare()
+        nodes = self.nodes
+        in_degree = self._in_degree
+        out_degree = self._out_degree
+        owned = self._owned
+        try:
+            for node_a, node_b in edges:
+                tmp_a = nodes.get(node_a)
+                if tmp_a is None:
+                    tmp_a = nodes[node_a] = Node(node_a)
+                    in_degree[node_a] = out_degree[node_a] = 0
+                    if owned is not None:
+                        owned.add(node_a)
+                tmp_b = nodes.get(node_b)
+                if tmp_b is None:
+                    tmp_b = nodes[node_b] = Node(node_b)
+                    in_degree[node_b] = out_degree[node_b] = 0
+                    if owned is not None:
+                        owned.add(node_b)
+                name_a = tmp_a.name
+                name_b = tmp_b.name
+                if name_b not in tmp_a.children:
+                    if owned is not None and (name_a not in owned or name_b not in owned):
+                        self._unshare(name_a, name_b)
+                        tmp_a = nodes[name_a]
+                        tmp_b = nodes[name_b]
+                    out_degree[name_a] += 1
+                    in_degree[name_b] += 1
+                    tmp_a.children[name_b] = tmp_b
+                    tmp_b.parents[name_a] = tmp_a
+        finally:
+            # The edges added before an error remain in the graph.
+            self._invalidate()
+
     def get_number_of_nodes(self):
         """
             Returns
@@ -155,11 +385,14 @@ class Graph(object):
             list
                 A list containing all parent nodes (or their names) of the specified node.
         """
+        if instrument.active is not None:
+            instrument.active.count("neighbour_lists")
         try:
             if return_names:
-                return [n.name for n in self.nodes[node].parents.values()]
+                return list(self.nodes[node].parents)
             else:
-                return list(self.nodes[node].parents.values())
+                # Looked up by name, see _unshare.
+                return [self.nodes[n] for n in self.nodes[node].parents]
         except KeyError:
             raise ValueError("The graph does not contain a node called {}".format(node))
             
@@ -182,14 +415,361 @@ class Graph(object):
             list
                 A list containing all children nodes (or their names) of the specified node.
         """
+        if instrument.active is not None:
+            instrument.active.count("neighbour_lists")
         try:
             if return_names:
-                return [n.name for n in self.nodes[node].children.values()]
+                return list(self.nodes[node].children)
             else:
-                return list(self.nodes[node].children.values())
+                # Looked up by name, see _unshare.
+                return [self.nodes[n] for n in self.nodes[node].children]
         except KeyError:
-            raise ValueError("The graph does not contain a node called {}".format(node)) 
-            
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the parents of the given node without
+            building an intermediate list.
+
+            Parameters
+            ----------
+            node: String
+                The name of the node whose parents are queried.
+
+            Returns
+            -------
+            iterator
+                An iterator over the names of all parents of the specified node.
+        """
+        try:
+            return iter(self.nodes[node].parents)
+        except KeyError:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the children of the given node without
+            building an intermediate list.
+
+            Parameters
+            ----------
+            node: String
+                The name of the node whose children are queried.
+
+            Returns
+            -------
+            iterator
+                An iterator over the names of all children of the specified node.
+        """
+        try:
+            return iter(self.nodes[node].children)
+        except KeyError:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def in_degree(self, node):
+        """
+            Parameters
+            ----------
+            node: String
+                The name of the node whose number of parents is queried.
+
+            Returns
+            -------
+            int
+                The number of parents of the specified node.
+        """
+        try:
+            return self._in_degree[node]
+        except KeyError:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def out_degree(self, node):
+        """
+            Parameters
+            ----------
+            node: String
+                The name of the node whose number of children is queried.
+
+            Returns
+            -------
+            int
+                The number of children of the specified node.
+        """
+        try:
+            return self._out_degree[node]
+        except KeyError:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def iter_degrees(self):
+        """
+            Iterates over the in- and out-degree of all nodes in the graph.
+
+            Returns
+            -------
+            iterator
+                An iterator over (node name, number of parents, number of
+                children) tuples.
+        """
+        in_degree = self._in_degree
+        out_degree = self._out_degree
+        return ((n, in_degree[n], out_degree[n]) for n in self.nodes)
+
+    def _recount(self):
+        """
+            Recomputes the degree counters from scratch, e.g. after the
+            nodes have been rewired directly.
+        """
+        self._in_degree = {name: len(n.parents) for name, n in self.nodes.items()}
+        self._out_degree = {name: len(n.children) for name, n in self.nodes.items()}
+
+    def _unshare(self, *names):
+        """
+            Prepares a change of the edges of the given nodes while the
+            graph shares its nodes with other graphs after a copy-on-write
+            copy. The graph gets its own node-name:node dictionary and
+            degree counters (shallow copies, which are cheap compared to
+            copying the nodes) and its own copies of the given nodes. All
+            other nodes remain shared. Needs to be called before every
+            change of the graph's structure.
+
+            As the parents and children of a copied node still refer to
+            the shared node objects, the graph always looks neighbours up
+            by name in its own dictionary rather than following the node
+            references.
+        """
+        shared = self._shared
+        if shared is None:
+            return
+        # Shallow copies of this graph change along with it. All of them
+        # are contained in shared as well.
+        peers = list(self._peers or (self,))
+        if len(shared) <= len(peers):
+            # All other graphs sharing the nodes have been discarded.
+            for graph in peers:
+                graph._shared = None
+                graph._owned = None
+            return
+        if self._owned is None:
+            with instrument.stage("copy"):
+                nodes = dict(self.nodes)
+                in_degree = dict(self._in_degree)
+                out_degree = dict(self._out_degree)
+                owned = set()
+                for graph in peers:
+                    graph.nodes = nodes
+                    graph._in_degree = in_degree
+                    graph._out_degree = out_degree
+                    graph._owned = owned
+        nodes = self.nodes
+        owned = self._owned
+        for name in names:
+            if name not in owned:
+                node = nodes[name]
+                new = nodes[name] = _copy_node(node)
+                new.parents = dict(node.parents)
+                new.children = dict(node.children)
+                owned.add(name)
+                if instrument.active is not None:
+                    instrument.active.count("node_copies")
+
+    def _closure(self, node, attr):
+        """
+            Collects all nodes reachable from the given node by following
+            the given attribute ("parents" or "children") with an explicit
+            stack. Results are cached until the graph is modified. The
+            least recently used closures are dropped once the cached
+            closures together hold more than CLOSURE_CACHE_BUDGET nodes.
+        """
+        key = (attr, getattr(node, "name", node))
+        closures = self._closures
+        try:
+            closures.move_to_end(key)
+            return closures[key]
+        except KeyError:
+            pass
+        # Neighbours are looked up by name, see _unshare.
+        nodes = self.nodes
+        seen = set()
+        stack = [key[1]]
+        while stack:
+            for name in getattr(nodes[stack.pop()], attr):
+                if name not in seen:
+                    seen.add(name)
+                    stack.append(name)
+        res = frozenset([nodes[name] for name in seen])
+        if len(res) > CLOSURE_CACHE_BUDGET:
+            return res
+        closures[key] = res
+        self._closure_size += len(res)
+        while self._closure_size > CLOSURE_CACHE_BUDGET:
+            self._closure_size -= len(closures.popitem(last=False)[1])
+        return res
+
+    def _reaches(self, node, target, attr):
+        """
+            Checks if the target can be reached from the given node by
+            following the given attribute ("parents" or "children"). Stops
+            as soon as the target was found.
+        """
+        target = getattr(target, "name", target)
+        node_name = getattr(node, "name", node)
+        cached = self._closures.get((attr, node_name))
+        if cached is not None:
+            return target in cached
+        if self._topology is not None and self._topology[1] is not None:
+            # In a DAG, ancestors are always ranked before their descendants.
+            ranks = self._topology[1]
+            if target in ranks and node_name in ranks:
+                if attr == "parents":
+                    possible = ranks[target] < ranks[node_name]
+                else:
+                    possible = ranks[target] > ranks[node_name]
+                if not possible:
+                    return False
+        nodes = self.nodes
+        seen = set()
+        stack = [node_name]
+        while stack:
+            for name in getattr(nodes[stack.pop()], attr):
+                if name == target:
+                    return True
+                if name not in seen:
+                    seen.add(name)
+                    stack.append(name)
+        return False
+
+    def _invalidate(self, change=None):
+        """
+            Drops all cached results, increments the version and records
+            the given change, for this graph as well as for all its
+            shallow copies. Needs to be called after every change of the
+            graph's structure.
+
+            Parameters
+            ----------
+            change: tuple, optional
+                The change as (operation, node_a, node_b) tuple, see
+                `changes_since`. None stands for changes that are not
+                recorded individually, e.g. bulk operations.
+        """
+        for graph in self._peers or (self,):
+            graph._closures.clear()
+            graph._closure_size = 0
+            graph._topology = None
+            graph.version += 1
+            graph._changes.append((graph.version, change))
+
+    def changes_since(self, version):
+        """
+            Returns the changes of the graph's structure after the given
+            version, so that derived results can be updated selectively.
+
+            Parameters
+            ----------
+            version: int
+                A previous value of the graph's version.
+
+            Returns
+            -------
+            list of tuples or None
+                The changes in order, each as one of
+                ("add_node", name, None), ("remove_node", name, None),
+                ("add_edge", node_a, node_b) or ("remove_edge", node_a, node_b).
+                None if the changes are not known, because they are no
+                longer contained in the change log or include a change
+                that is not recorded individually. In that case, all
+                results derived from the graph should be discarded.
+        """
+        if version >= self.version:
+            return []
+        changes = self._changes
+        if not changes or changes[0][0] > version + 1:
+            return None
+        res = [change for v, change in changes if v > version]
+        if None in res:
+            return None
+        return res
+
+    def _topological_sort(self):
+        """
+            Computes (and caches until the next change) a topological order
+            with Kahn's algorithm, together with the rank of each node in
+            that order. Both are None if the graph contains a cycle.
+        """
+        if self._topology is not None:
+            return self._topology
+        in_degree = dict(self._in_degree)
+        queue = deque(n for n, d in in_degree.items() if d == 0)
+        order = []
+        while queue:
+            name = queue.popleft()
+            order.append(name)
+            for c in self.nodes[name].children:
+                in_degree[c] -= 1
+                if in_degree[c] == 0:
+                    queue.append(c)
+        if len(order) < len(self.nodes):
+            self._topology = (None, None)
+        else:
+            self._topology = (order, {n: i for i, n in enumerate(order)})
+        return self._topology
+
+    def is_acyclic(self):
+        """
+            Checks whether the graph is a directed acyclic graph. The result
+            is cached until the graph is changed.
+
+            Returns
+            -------
+            bool
+                True if the graph does not contain a directed cycle, False
+                otherwise. Undirected graphs are always cyclic, unless they
+                have no edges.
+        """
+        return self._topological_sort()[0] is not None
+
+    def topological_order(self):
+        """
+            Returns the node names in topological order, i.e. every node
+            comes after all its ancestors. The order is computed with
+            Kahn's algorithm and cached until the graph is changed. As long
+            as it is cached, `is_ancestor` and `is_descendant` use it to
+            answer impossible queries in O(1).
+
+            Returns
+            -------
+            list of Strings
+                The names of all nodes in topological order.
+
+            Raises
+            ----------
+            ValueError
+                If the graph contains a cycle.
+        """
+        order = self._topological_sort()[0]
+        if order is None:
+            raise ValueError("The graph contains a cycle")
+        return list(order)
+
+    def topological_ranks(self):
+        """
+            Returns the position of every node in `topological_order`.
+
+            Returns
+            -------
+            dict
+                A dictionary containing node-name:rank pairs.
+
+            Raises
+            ----------
+            ValueError
+                If the graph contains a cycle.
+        """
+        ranks = self._topological_sort()[1]
+        if ranks is None:
+            raise ValueError("The graph contains a cycle")
+        return dict(ranks)
+
     def get_ancestors(self, node):
         """
             Parameters
@@ -199,18 +779,10 @@ class Graph(object):
                 
             Returns
             -------
-            list
-                A list containing all ancestor nodes of the specified node.
-        """
-        def _add_parents(tmp_node):
-            for p in tmp_node.parents.values():
-                if p in res:
-                    continue
-                res.add(p)
-                _add_parents(p)
-        res = set()
-        _add_parents(self.nodes[node])
-        return res
+            set
+                A set containing all ancestor nodes of the specified node.
+        """
+        return set(self._closure(node, "parents"))
 
     def is_ancestor(self, node_a, node_b):
         """
@@ -229,10 +801,7 @@ class Graph(object):
             bool
                 True if node_a is an ancestor of node_b, False otherwise.
         """
-        # The "in" check works despite node_a being a string an get_ancestors returning
-        # a list of node objects, since our node class overwrites the __eq__ method used
-        # by the "in" check.
-        return node_a in self.get_ancestors(node_b)
+        return self._reaches(node_b, node_a, "parents")
 
     def get_descendants(self, node):
         """
@@ -243,18 +812,29 @@ class Graph(object):
                 
             Returns
             -------
-            list
-                A list containing all descendant nodes of the specified node.
-        """
-        def _add_children(tmp_node):
-            for p in tmp_node.children.values():
-                if p in res:
-                    continue
-                res.add(p)
-                _add_children(p)
-        res = set()
-        _add_children(self.nodes[node])
-        return res
+            set
+                A set containing all descendant nodes of the specified node.
+        """
+        return set(self._closure(node, "children"))
+
+    def cached_descendants(self, node):
+        """
+            Returns the descendants of the given node if they are still
+            cached from an earlier `get_descendants` call, without
+            computing (and caching) them otherwise.
+
+            Parameters
+            ----------
+            node: String or `ccbase.nodes.Node`
+                The name of the node whose descendants are queried.
+
+            Returns
+            -------
+            frozenset or None
+                The descendant nodes of the specified node, or None if they
+                are not cached. The nodes compare equal to their names.
+        """
+        return self._closures.get(("children", getattr(node, "name", node)))
 
     def is_descendant(self, node_a, node_b):
         """
@@ -273,9 +853,9 @@ class Graph(object):
             bool
                 True if node_a is a descendant of node_b, False otherwise.
         """
-        return node_b in self.get_ancestors(node_a)
+        return self._reaches(node_b, node_a, "children")
             
-    def copy(self, deep=True):
+    def copy(self, deep=True, copy_on_write=False):
         """
             Copies the current graph.
             
@@ -284,39 +864,313 @@ class Graph(object):
             deep: Bool, optional (Default:True)
                 If true, a deep copy will be performed, i.e. all nodes are also
                 copied. In a shallow copy, both graph instances will contain the
-                same node references.
+                same node references. Changes made through either of them
+                are seen by both, including their cached results and
+                versions.
+            copy_on_write: Bool, optional (Default:False)
+                If true, the copy shares the nodes with this graph. A
+                change of either graph only copies the nodes whose edges it
+                changes, together with a shallow copy of the node-name
+                dictionary on the first change. Nothing is copied once all
+                other graphs sharing the nodes have been discarded. This
+                makes copies for "what-if" changes cheap. Node objects must
+                not be changed directly while they are shared, and their
+                parents and children may refer to the node objects of the
+                other graphs, so neighbours should be looked up by name.
             
             Returns
             -------
             Graph
                 Creates a (deep) copy of this graph.
         """
-       
-        if deep:
-            return copy.deepcopy(self)
-        else:
-             return copy.copy(self)
+        if copy_on_write and deep:
+            if self._shared is None:
+                # Shallow copies of this graph share the nodes as well.
+                shared = weakref.WeakSet(self._peers or (self,))
+                for graph in shared:
+                    graph._shared = shared
+            # The copy shares the node-name dictionary as well.
+            for graph in self._peers or (self,):
+                graph._owned = None
+            res = copy.copy(self)
+            res._peers = None
+            self._shared.add(res)
+            res._closures = OrderedDict(self._closures)
+            res._changes = copy.copy(self._changes)
+            return res
+        if instrument.active is not None:
+            instrument.active.count("graph_copies")
+        with instrument.stage("copy"):
+            if deep:
+                return copy.deepcopy(self)
+            if self._peers is None:
+                self._peers = weakref.WeakSet((self,))
+            res = copy.copy(self)
+            self._peers.add(res)
+            if self._shared is not None:
+                self._shared.add(res)
+            res._closures = OrderedDict(self._closures)
+            res._changes = copy.copy(self._changes)
+            return res
+
+    def __deepcopy__(self, memo):
+        """
+            Copies the graph without recursing along its edges (see
+            `_copy_nodes`), so that `copy.deepcopy` works for graphs of
+            any size. All other attributes are deep copied as usual.
+        """
+        res = self.__class__.__new__(self.__class__)
+        memo[id(self)] = res
+        for key, value in self.__dict__.items():
+            if key not in ("nodes", "_in_degree", "_out_degree", "_closures",
+                           "_topology", "_shared", "_owned", "_peers"):
+                setattr(res, key, copy.deepcopy(value, memo))
+        res.nodes = _copy_nodes(self.nodes, memo)
+        res._in_degree = dict(self._in_degree)
+        res._out_degree = dict(self._out_degree)
+        res._closures = OrderedDict()
+        res._closure_size = 0
+        # The cached topological order is never changed in place.
+        res._topology = self._topology
+        res._shared = None
+        res._owned = None
+        res._peers = None
+        return res
+
+    def __copy__(self):
+        # Unlike pickling (see __getstate__), a shallow copy keeps all
+        # attributes, including the graphs sharing the nodes.
+        res = self.__class__.__new__(self.__class__)
+        res.__dict__.update(self.__dict__)
+        return res
+
+    def __getstate__(self):
+        # A pickled graph does not share its nodes with any other graph.
+        state = self.__dict__.copy()
+        state["_shared"] = None
+        state["_owned"] = None
+        state["_peers"] = None
+        return state
             
-    def to_undirected(self):
+    def freeze(self):
+        """
+            Creates an immutable, compact copy of this graph that stores its
+            edges as integer CSR arrays.
+
+            Returns
+            -------
+            ccbase.frozen.FrozenGraph
+                A frozen copy of this graph.
+        """
+        return FrozenGraph.from_graph(self)
+
+    def save(self, path):
+        """
+            Stores the graph in a compact binary file, see
+            `ccbase.fileio.save_binary`.
+
+            Parameters
+            ----------
+            path: String
+                The path of the file to write.
+        """
+        self.freeze().save(path)
+
+    @staticmethod
+    def load(path, mmap=True):
+        """
+            Loads a graph stored with `save`, see `ccbase.fileio.load_binary`.
+            The loaded graph is immutable, use its thaw method to obtain
+            a mutable copy.
+
+            Parameters
+            ----------
+            path: String
+                The path of the file to read.
+            mmap: Bool, optional (Default:True)
+                If true, the file is memory mapped rather than read.
+
+            Returns
+            -------
+            ccbase.frozen.FrozenGraph
+                The loaded graph.
+        """
+        return FrozenGraph.load(path, mmap)
+
+    def to_undirected(self, as_view=False):
         """
             Returns an undirected copy this graph. Sine this implementation
             does not really specify edge directions, we consider a bidrectional
             graph as undirected!
             
+            Parameters
+            ----------
+            as_view: Bool, optional (Default:False)
+                If true, a read-only `ccbase.views.UndirectedView` on this
+                graph is returned instead, which does not copy anything.
+
             Returns
             -------
             Graph
                 An undirected copy of this graph.
         """
+        if as_view:
+            return UndirectedView(self)
+        with instrument.stage("to_undirected"):
+            res = self.copy()
+            if res.is_directed:
+                for n in res.nodes.values():
+                    for p in n.parents.values():
+                        n.add_child(p)
+                        p.add_parent(n)
+                    for c in n.children.values():
+                        c.add_child(n)
+                        n.add_parent(c)
+                res.is_directed = False  
+                res._recount()
+                res._invalidate()
+        return res
+
+    def ancestral_subgraph(self, nodes):
+        """
+            Returns a read-only view on the given nodes and all their
+            ancestors, see `ccbase.dsep.ancestral_subgraph`.
+
+            Parameters
+            ----------
+            nodes: iterable of String or `ccbase.nodes.Node`
+                The nodes whose ancestors are to be kept.
+
+            Returns
+            -------
+            ccbase.views.SubgraphView
+                A view on the ancestral subgraph.
+        """
+        return dsep.ancestral_subgraph(self, nodes)
+
+    def subgraph(self, nodes):
+        """
+            Returns a read-only view on the subgraph induced by the given
+            nodes, i.e. on these nodes and the edges between them. Nothing
+            is copied, so creating the view only takes time in the number of
+            given nodes. The view can be used with all query functions.
+
+            Parameters
+            ----------
+            nodes: iterable of String or `ccbase.nodes.Node`
+                The nodes to keep.
+
+            Returns
+            -------
+            ccbase.views.SubgraphView
+                A view on the induced subgraph.
+
+            Raises
+            ----------
+            ValueError
+                If any of the given nodes is not in the graph.
+        """
+        return SubgraphView(self, nodes)
+
+    def without(self, nodes):
+        """
+            Returns a read-only view on this graph without the given nodes
+            (e.g. latent variables) and their edges. As for `subgraph`,
+            nothing is copied.
+
+            Parameters
+            ----------
+            nodes: iterable of String or `ccbase.nodes.Node`
+                The nodes to leave out.
+
+            Returns
+            -------
+            ccbase.views.ExcludingView
+                A view on the remaining graph.
+
+            Raises
+            ----------
+            ValueError
+                If any of the given nodes is not in the graph.
+        """
+        return ExcludingView(self, nodes)
+
+    def moralize(self):
+        """
+            Returns the moral graph of this graph, in which the parents of
+            every node are connected and edge directions are dropped. As for
+            `to_undirected`, undirected edges are stored in both directions.
+            To moralize only the ancestral subgraph of some nodes, use
+            `self.ancestral_subgraph(nodes).moralize()`.
+
+            Returns
+            -------
+            Graph
+                An undirected moral graph.
+        """
+        return dsep.moralize(self)
+
+    def markov_blanket(self, node):
+        """
+            Returns the Markov blanket of the given node, see
+            `ccbase.blankets.markov_blanket`.
+
+            Parameters
+            ----------
+            node: String or `ccbase.nodes.Node`
+                The node whose Markov blanket is queried.
+
+            Returns
+            -------
+            set of Strings
+                The names of the node's parents, its children and the other
+                parents of its children.
+
+            Raises
+            ----------
+            ValueError
+                If the specified node is not in the graph.
+        """
+        return blankets.markov_blanket(self, node)
+
+    def markov_blankets(self, as_matrix=False):
+        """
+            Returns the Markov blankets of all nodes, computed in one sweep
+            over the edges, see `ccbase.blankets.markov_blankets`.
+
+            Parameters
+            ----------
+            as_matrix: Bool, optional (Default:False)
+                If true, the blankets are returned as a sparse boolean
+                matrix with the nodes in the order of self.nodes.
+
+            Returns
+            -------
+            dict or sparse matrix
+                A dictionary containing node-name:set pairs, or the matrix.
+        """
+        return blankets.markov_blankets(self, as_matrix)
+
+    def reverse(self, as_view=False):
+        """
+            Returns a copy of this graph in which all edges are reversed.
+
+            Parameters
+            ----------
+            as_view: Bool, optional (Default:False)
+                If true, a read-only `ccbase.views.ReversedView` on this
+                graph is returned instead, which does not copy anything.
+
+            Returns
+            -------
+            Graph
+                A reversed copy of this graph.
+        """
+        if as_view:
+            return ReversedView(self)
         res = self.copy()
-        if res.is_directed:
-            for n in res.nodes.values():
-                for p in n.parents.values():
-                    n.add_child(p)
-                    p.add_parent(n)
-                for c in n.children.values():
-                    c.add_child(n)
-                    n.add_parent(c)
-            res.is_directed = False  
+        for n in res.nodes.values():
+            n.parents, n.children = n.children, n.parents
+        res._in_degree, res._out_degree = res._out_degree, res._in_degree
+        res._invalidate()
         return res
-        
\ No newline at end of file
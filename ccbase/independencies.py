@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Enumeration of the conditional independencies implied by a DAG.
+
+Rather than testing every (X, Y, Z) triple, `iter_local_markov` yields the
+local Markov basis, from which all other implied independencies follow,
+and `iter_pairwise_independencies` yields all d-separated pairs for a
+single conditioning set with one traversal per node. Both are generators
+that only hold the data of the node currently being processed, so memory
+stays bounded by the size of the graph rather than the number of results.
+"""
+
+from .dsep import _adjacency, _conditioning_keys, ancestral_closure, reach
+
+
+def _names(dg, index):
+    """
+        Returns a function converting keys back to node names.
+    """
+    if index is None:
+        return list
+    names = dg.names
+    return lambda keys: [names[k] for k in keys]
+
+
+def _descendants(dg, children, key):
+    """
+        Returns the descendants of the given key. Closures cached by a
+        `ccbase.graph.Graph` are reused, but no new ones are added to its
+        cache, which would otherwise be filled with one closure per node.
+    """
+    cached_descendants = getattr(dg, "cached_descendants", None)
+    if cached_descendants is not None:
+        cached = cached_descendants(key)
+        if cached is not None:
+            return cached
+    res = ancestral_closure(children, (key,))
+    res.discard(key)
+    return res
+
+
+def iter_local_markov(dg):
+    """
+        Generates the local Markov basis of the given graph: every node is
+        independent of its non-descendants given its parents. Nodes whose
+        non-descendants are all parents do not imply an independence and
+        are skipped.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph whose independencies are to be enumerated.
+
+        Yields
+        --------
+        (list, list, list) tuples of Strings
+            ([node], non-descendants without the parents, parents) in the
+            form of the (nodes_x, nodes_y, nodes_z) arguments of
+            `check_independence`, so that the results can be checked
+            directly, e.g. with `check_independence_many`.
+    """
+    parents, children, index = _adjacency(dg)
+    to_names = _names(dg, index)
+    keys = list(range(dg.num_nodes)) if index is not None else list(dg.nodes)
+    for key in keys:
+        node_parents = set(parents(key))
+        descendants = _descendants(dg, children, key)
+        others = [k for k in keys
+                  if k != key and k not in node_parents and k not in descendants]
+        if others:
+            yield to_names((key,)), to_names(others), to_names(node_parents)
+
+
+def iter_pairwise_independencies(dg, nodes_z=(), nodes=None):
+    """
+        Generates all pairs of nodes that are d-separated given nodes_z.
+        The ancestors of nodes_z are computed once, after that every node
+        costs a single traversal of the graph.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph whose independencies are to be enumerated.
+        nodes_z: iterable of ccbase.nodes.Node or String, optional
+            The set of conditioned nodes. Defaults to the empty set, i.e.
+            marginal independencies.
+        nodes: iterable of ccbase.nodes.Node or String, optional
+            Only pairs among these nodes are generated. Defaults to all
+            nodes of the graph.
+
+        Yields
+        --------
+        (String, String) tuples
+            The names of two nodes (neither of them in nodes_z) that are
+            d-separated given nodes_z. Every pair is generated once, with
+            the first node preceding the second one in the order of nodes.
+    """
+    parents, children, index = _adjacency(dg)
+    z = _conditioning_keys(dg, nodes_z, index)
+    ancestors_z = ancestral_closure(parents, z)
+    if nodes is None:
+        keys = list(range(dg.num_nodes)) if index is not None else list(dg.nodes)
+    else:
+        keys = [getattr(n, "name", n) for n in nodes]
+        for name in keys:
+            if name not in dg.nodes:
+                raise ValueError("The graph does not contain a node called {}".format(name))
+        if index is not None:
+            keys = [index[n] for n in keys]
+    keys = [k for k in keys if k not in z]
+    to_names = _names(dg, index)
+    for i, key in enumerate(keys):
+        reached = reach(parents, children, (key,), z, ancestors_z)
+        name = to_names((key,))[0]
+        for other in to_names(k for k in keys[i + 1:] if k not in reached):
+            yield name, other
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optional instrumentation of the graph queries. Instrumentation is off by
+default, in which case the hooks in the hot paths only check whether
+`active` is None. It can be switched on for a block of code:
+
+    with instrument.instrumented() as rec:
+        check_independence(dg, ["A"], ["B"], ["C"])
+    print(rec.as_dict())
+
+or for the whole process by setting the environment variable
+CCBASE_INSTRUMENT=1, in which case a summary is printed to stderr when
+the process exits.
+
+The following counters are collected:
+
+- traversal_steps: nodes visited by graph traversals and path searches.
+- paths_enumerated: complete paths generated by path enumeration.
+- paths_pruned: partial paths dropped because they were already blocked.
+- neighbour_lists: lists of parents or children built by get_parents
+  and get_children.
+- graph_copies: copies of a whole graph.
+- node_copies: nodes copied by a copy-on-write graph before changing them.
+
+In addition, the wall time of each stage (e.g. "reach", "ancestors",
+"copy") and of each top level query is recorded.
+"""
+
+import atexit
+import functools
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+# The currently active Recorder, or None if instrumentation is disabled.
+active = None
+
+_NO_STAGE = nullcontext()
+
+
+class Recorder(object):
+    """
+        Collects counters and timings while it is active.
+
+        Attributes
+        ----------
+        counters: dict
+            A dictionary containing counter-name:total pairs.
+        stages: dict
+            A dictionary containing stage-name:[calls, seconds] pairs.
+        queries: list of dict
+            One entry per instrumented query, holding its name, its wall
+            time and the counters it incremented. At most max_queries
+            entries are kept.
+        max_queries: int
+            The maximum number of query entries that are kept.
+    """
+
+    def __init__(self, max_queries=10000):
+        self.counters = {}
+        self.stages = {}
+        self.queries = []
+        self.max_queries = max_queries
+
+    def count(self, name, n=1):
+        """
+            Increments the given counter by n.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name):
+        """
+            Records the wall time of the enclosed block as the given stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def run_query(self, name, func, args, kwargs):
+        """
+            Calls func and records its wall time and counters as a query.
+        """
+        before = dict(self.counters)
+        with self.stage(name):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                if len(self.queries) < self.max_queries:
+                    delta = {k: v - before.get(k, 0) for k, v in self.counters.items()
+                             if v != before.get(k, 0)}
+                    self.queries.append({"query": name, "seconds": seconds, "counters": delta})
+
+    def as_dict(self):
+        """
+            Returns
+            -------
+            dict
+                The counters, the stages (as {"calls", "seconds"} dicts) and
+                the recorded queries.
+        """
+        return {"counters": dict(self.counters),
+                "stages": {name: {"calls": calls, "seconds": seconds}
+                           for name, (calls, seconds) in self.stages.items()},
+                "queries": list(self.queries)}
+
+    def create_stats(self):
+        """
+            Creates the stats attribute in the format used by the cProfile
+            module, with one entry per stage. This allows to pass a Recorder
+            directly to `pstats.Stats`.
+        """
+        self.stats = {("ccbase", 0, name): (calls, calls, seconds, seconds, {})
+                      for name, (calls, seconds) in self.stages.items()}
+
+    def dump_stats(self, path):
+        """
+            Writes the stages to a file that can be loaded with `pstats.Stats`.
+        """
+        import marshal
+        self.create_stats()
+        with open(path, "wb") as f:
+            marshal.dump(self.stats, f)
+
+    def summary(self):
+        """
+            Returns a human readable summary of the counters and stages.
+        """
+        lines = ["{:<24} {:>14}".format(name, value)
+                 for name, value in sorted(self.counters.items())]
+        lines.extend("{:<24} {:>8} calls {:>12.6f}s".format(name, calls, seconds)
+                     for name, (calls, seconds) in sorted(self.stages.items()))
+        return "\n".join(lines)
+
+
+@contextmanager
+def instrumented(recorder=None):
+    """
+        Enables instrumentation within the enclosed block.
+
+        Parameters
+        ----------
+        recorder: Recorder, optional
+            The recorder to use. A new one is created if omitted.
+
+        Yields
+        --------
+        Recorder
+            The active recorder.
+    """
+    global active
+    previous = active
+    active = Recorder() if recorder is None else recorder
+    try:
+        yield active
+    finally:
+        active = previous
+
+
+def count(name, n=1):
+    """
+        Increments the given counter of the active recorder, if any.
+    """
+    if active is not None:
+        active.count(name, n)
+
+
+def stage(name):
+    """
+        Returns a context manager timing the enclosed block as the given
+        stage, or a no-op context manager if instrumentation is disabled.
+    """
+    if active is None:
+        return _NO_STAGE
+    return active.stage(name)
+
+
+def query(func):
+    """
+        Decorator recording every call of func as a query while
+        instrumentation is enabled.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if active is None:
+            return func(*args, **kwargs)
+        return active.run_query(name, func, args, kwargs)
+    return wrapper
+
+
+def _print_summary(recorder):
+    sys.stderr.write("ccbase instrumentation summary:\n{}\n".format(recorder.summary()))
+
+
+if os.environ.get("CCBASE_INSTRUMENT", "") not in ("", "0"):
+    active = Recorder()
+    atexit.register(_print_summary, active)
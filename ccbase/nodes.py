@@ -22,7 +22,12 @@ class Node(object):
         children: dict
             A dictionary containing child-name:Node pairs for children of this node
 
+        Nodes use __slots__ rather than an instance dictionary to save
+        memory, since large graphs contain millions of them. Subclasses
+        that do not define __slots__ themselves get a dictionary again.
     """
+
+    __slots__ = ("name", "parents", "children")
     
     def __init__(self, name):
         self.name = name
@@ -98,7 +103,8 @@ class Node(object):
         """
             The hash of a node is the same as the hash of its name.
             This allows to reference nodes in dictionaries by their object
-            instantiation or their name.
+            instantiation or their name. Strings cache their own hash, so
+            for string names this does not rehash the name.
         """
         return hash(self.name)
         
@@ -123,6 +129,12 @@ class Node(object):
             In order for the access in dictionaries via the name to work, a
             random node is equal to its name as well.
         """
+        # Fast paths for the most common comparisons in set and dict
+        # lookups: the node itself and a (string) name.
+        if other is self:
+            return True
+        if type(other) is str:
+            return other == self.name
         try:
             return other.name == self.name
         except AttributeError:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel execution of d-separation queries on a pool of worker processes.
+
+The graph is frozen (see `ccbase.graph.Graph.freeze`) and sent to every
+worker exactly once when the pool is started. Graphs loaded from a memory
+mapped binary file are only sent by their path, so all workers share the
+mapped pages. Queries are then sent to the workers in chunks and the
+results are returned in input order. If only a single process is
+requested, the workload is small, or no process pool can be started, the
+queries are answered in the calling process instead.
+"""
+
+import multiprocessing
+from itertools import chain, islice
+
+from .dsep import d_separated, d_separated_many
+
+# The graph of a worker process, set by _init_worker.
+_graph = None
+
+
+def _init_worker(graph):
+    global _graph
+    _graph = graph
+
+
+def _check_chunk(queries):
+    return list(d_separated_many(_graph, queries))
+
+
+def _check_sources(args):
+    nodes_x, nodes_y, nodes_z = args
+    return d_separated(_graph, nodes_x, nodes_y, nodes_z)
+
+
+def _names(nodes):
+    return tuple(getattr(n, "name", n) for n in nodes)
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class IndependenceExecutor(object):
+    """
+        Answers d-separation queries against a fixed graph in parallel.
+        Should be used as a context manager, or closed explicitly, so that
+        the worker processes are shut down.
+
+        Attributes
+        ----------
+        graph: ccbase.frozen.FrozenGraph
+            The frozen graph the queries refer to.
+        processes: int
+            The number of worker processes.
+        chunksize: int
+            The number of queries sent to a worker at once.
+        min_parallel: int
+            Workloads with fewer queries (or, for a single query, fewer
+            nodes in nodes_x) are answered in the calling process.
+    """
+
+    def __init__(self, dg, processes=None, chunksize=256, min_parallel=None):
+        self.graph = dg.freeze()
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self.min_parallel = chunksize if min_parallel is None else min_parallel
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+            Shuts down the worker processes, if they have been started.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _get_pool(self):
+        """
+            Returns the process pool, starting it on first use. Returns None
+            if parallel execution is disabled or not available.
+        """
+        if self.processes < 2:
+            return None
+        if self._pool is None:
+            try:
+                self._pool = multiprocessing.Pool(self.processes, _init_worker, (self.graph,))
+            except (OSError, ImportError, NotImplementedError):
+                # E.g. platforms without working semaphores.
+                self.processes = 1
+                return None
+        return self._pool
+
+    def map(self, queries):
+        """
+            Answers the given queries, see `ccbase.dsep.d_separated_many`.
+
+            Parameters
+            ----------
+            queries: iterable of (nodes_x, nodes_y, nodes_z) tuples
+                The queries to answer.
+
+            Yields
+            --------
+            bool
+                The result of each query, in input order.
+        """
+        queries = (tuple(_names(part) for part in query) for query in queries)
+        head = list(islice(queries, self.min_parallel))
+        pool = self._get_pool() if len(head) >= self.min_parallel else None
+        if pool is None:
+            for res in d_separated_many(self.graph, head):
+                yield res
+            for res in d_separated_many(self.graph, queries):
+                yield res
+            return
+        chunks = _chunks(chain(head, queries), self.chunksize)
+        for results in pool.imap(_check_chunk, chunks):
+            for res in results:
+                yield res
+
+    def check(self, nodes_x, nodes_y, nodes_z):
+        """
+            Answers a single query by splitting nodes_x across the workers.
+
+            Returns
+            -------
+            bool
+                True if all nodes in nodes_x are d-separated from all nodes
+                in nodes_y given nodes_z, False otherwise.
+        """
+        nodes_x, nodes_y, nodes_z = _names(nodes_x), _names(nodes_y), _names(nodes_z)
+        pool = self._get_pool() if len(nodes_x) >= self.min_parallel else None
+        if pool is None:
+            return d_separated(self.graph, nodes_x, nodes_y, nodes_z)
+        size = -(-len(nodes_x) // self.processes)
+        parts = [(nodes_x[i:i + size], nodes_y, nodes_z) for i in range(0, len(nodes_x), size)]
+        return all(pool.imap_unordered(_check_sources, parts))
+
+
+def check_independence_parallel(dg, queries, processes=None, chunksize=256):
+    """
+        Answers many d-separation queries in parallel, see
+        `IndependenceExecutor`.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        queries: iterable of (nodes_x, nodes_y, nodes_z) tuples
+            The queries to answer, e.g. from `ccbase.fileio.iter_queries`.
+        processes: int, optional
+            The number of worker processes. Defaults to the number of CPUs.
+        chunksize: int, optional (Default:256)
+            The number of queries sent to a worker at once.
+
+        Returns
+        -------
+        list of bool
+            The result of each query, in input order.
+    """
+    with IndependenceExecutor(dg, processes, chunksize) as executor:
+        return list(executor.map(queries))
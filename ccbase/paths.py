@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Enumeration of the undirected paths between two nodes.
+
+`iter_paths` lazily generates the paths as lists of node names.
+Lists of node name lists need several Python objects per path node.
+`enumerate_paths` instead appends every path to one flat array of integer
+node ids, together with an array of offsets marking where each path
+ends, so that memory grows by four bytes per path node. On a
+`ccbase.frozen.FrozenGraph` these are the graph's own ids. On other
+graphs, ids are assigned to the nodes in the order they are first used. It can also stop after a
+number of paths or a time budget, or only count the paths.
+"""
+
+import time
+from array import array
+
+from . import instrument
+from .dsep import QueryContext, _adjacency, _check_nodes, ancestral_closure, as_context
+from .frozen import INDPTR_TYPE, INDICES_TYPE, np
+
+# The number of search steps between two checks of the time budget.
+_CLOCK_INTERVAL = 1024
+
+# Marks an exhausted neighbour iterator in iter_paths.
+_END = object()
+
+
+def iter_paths(dg, node_x, node_y, max_len=None, limit=None, nodes_z=None):
+    """
+        Lazily generates the undirected paths between node_x and node_y
+        within the graph, in depth first order.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph in which to compute the paths.
+        node_x: ccbase.nodes.Node or String
+            The node object or name for the first of the two nodes.
+        node_y: ccbase.nodes.Node or String
+            The node object or name for the second of the two nodes.
+        max_len: int, optional
+            The maximum number of edges of a generated path.
+        limit: int, optional
+            The maximum number of paths to generate.
+        nodes_z: iterable of ccbase.nodes.Node or Strings, optional
+            If given, partial paths that are already blocked given these
+            nodes are dropped, so that only open paths are generated. May
+            also be a ccbase.dsep.QueryContext for these nodes.
+
+        Yields
+        --------
+        list of Strings
+            The node names of an undirected path from node_x to node_y.
+    """
+    if limit is not None and limit <= 0:
+        return
+    node_x = getattr(node_x, "name", node_x)
+    node_y = getattr(node_y, "name", node_y)
+    is_blocked = None
+    if nodes_z is not None:
+        context = as_context(dg, nodes_z)
+        is_blocked = context.is_blocked
+        # Every node on an open path is an ancestor of node_x, node_y or
+        # nodes_z, so the search can ignore all other nodes.
+        dg = context.ancestral_subgraph((node_x, node_y))
+    # A view presents parents and children as neighbours without copying
+    # the graph. The blocking checks still need the directed graph though.
+    neighbours = dg.to_undirected(as_view=True).iter_children
+    stack = [neighbours(node_x)]
+    if node_x == node_y:
+        yield [node_x]
+        return
+    path = [node_x]
+    visited = {node_x}
+    found = pruned = steps = 0
+    try:
+        while stack:
+            nxt = next(stack[-1], _END)
+            if nxt is _END:
+                stack.pop()
+                visited.discard(path.pop())
+                continue
+            if nxt in visited:
+                continue
+            if is_blocked is not None and len(path) > 1 and \
+                    is_blocked(path[-2], path[-1], nxt):
+                pruned += 1
+                continue
+            if nxt == node_y:
+                if max_len is None or len(path) <= max_len:
+                    yield path + [nxt]
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+                continue
+            if max_len is not None and len(path) >= max_len:
+                continue
+            path.append(nxt)
+            visited.add(nxt)
+            stack.append(neighbours(nxt))
+            steps += 1
+    finally:
+        # Reported once per enumeration to keep the loop itself cheap.
+        if instrument.active is not None:
+            instrument.active.count("traversal_steps", steps)
+            instrument.active.count("paths_enumerated", found)
+            instrument.active.count("paths_pruned", pruned)
+
+
+class PathBuffer(object):
+    """
+        Holds enumerated paths as node ids: path i consists of
+        ids[offsets[i]:offsets[i+1]].
+
+        Attributes
+        ----------
+        names: sequence
+            The node names, indexed by node id. For graphs that are not
+            frozen, it only holds the nodes that have been used.
+        ids: array('i') or None
+            The ids of the nodes of all paths, one path after the other.
+            None if the paths were only counted.
+        offsets: array('q') or None
+            The start of every path in ids, followed by the end of the
+            last path. None if the paths were only counted.
+        count: int
+            The number of paths found.
+        complete: bool
+            False if the enumeration stopped because max_paths or the time
+            budget was reached, True if all paths have been enumerated.
+    """
+
+    def __init__(self, names, ids, offsets, count, complete):
+        self.names = names
+        self.ids = ids
+        self.offsets = offsets
+        self.count = count
+        self.complete = complete
+
+    def __len__(self):
+        return self.count
+
+    def path_ids(self, i):
+        """
+            Returns the node ids of the i-th path.
+        """
+        if self.ids is None:
+            raise ValueError("The paths were only counted")
+        return self.ids[self.offsets[i]:self.offsets[i + 1]]
+
+    def __getitem__(self, i):
+        """
+            Returns the node names of the i-th path.
+        """
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("path index out of range")
+        names = self.names
+        return [names[k] for k in self.path_ids(i)]
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def to_numpy(self):
+        """
+            Returns ids and offsets as NumPy arrays sharing the memory of
+            the buffers.
+        """
+        if np is None:
+            raise ImportError("NumPy is required for to_numpy")
+        if self.ids is None:
+            raise ValueError("The paths were only counted")
+        return (np.frombuffer(self.ids, dtype=np.dtype(INDICES_TYPE)),
+                np.frombuffer(self.offsets, dtype=np.dtype(INDPTR_TYPE)))
+
+
+def _neighbours(parents, children, key):
+    """
+        Returns the neighbours of the given key in the same order as
+        `ccbase.views.UndirectedView`: children first, then the parents
+        that are not also children.
+    """
+    res = list(children(key))
+    seen = set(res)
+    res.extend(p for p in parents(key) if p not in seen)
+    return res
+
+
+class _LazyIndex(object):
+    """
+        Assigns consecutive ids to node names in the order they are first
+        used, so that paths of graphs that are not frozen can be stored
+        in a `PathBuffer` without indexing the whole graph.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._ids = {}
+
+    def ids(self, keys):
+        res = []
+        for name in keys:
+            i = self._ids.get(name)
+            if i is None:
+                i = self._ids[name] = len(self.names)
+                self.names.append(name)
+            res.append(i)
+        return res
+
+
+def enumerate_paths(dg, node_x, node_y, nodes_z=None, max_length=None, max_paths=None,
+                    time_budget=None, count_only=False):
+    """
+        Enumerates the undirected paths between node_x and node_y, in the
+        same order as `iter_paths`, into a `PathBuffer`.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph in which to compute the paths. The search only
+            touches the nodes it visits, so graphs are not frozen or
+            copied first.
+        node_x: ccbase.nodes.Node or String
+            The node object or name for the first of the two nodes.
+        node_y: ccbase.nodes.Node or String
+            The node object or name for the second of the two nodes.
+        nodes_z: iterable of ccbase.nodes.Node or Strings, optional
+            If given, only paths that are open given these nodes are
+            enumerated.
+        max_length: int, optional
+            The maximum number of edges of a path.
+        max_paths: int, optional
+            The maximum number of paths to enumerate.
+        time_budget: float, optional
+            The time in seconds after which the enumeration is stopped.
+        count_only: Bool, optional (Default:False)
+            If true, the paths are only counted and not stored.
+
+        Returns
+        -------
+        PathBuffer
+            The paths (or their number). Its complete attribute tells
+            whether the enumeration was stopped early.
+
+        Raises
+        ----------
+        ValueError
+            If node_x or node_y is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    (source,) = _check_nodes(dg, (node_x,), index)
+    (target,) = _check_nodes(dg, (node_y,), index)
+    if index is None:
+        lazy_index = _LazyIndex()
+        names, key_ids = lazy_index.names, lazy_index.ids
+    else:
+        names, key_ids = dg.names, None
+    ids = offsets = None
+    if not count_only:
+        ids = array(INDICES_TYPE)
+        offsets = array(INDPTR_TYPE, [0])
+    count = 0
+
+    def emit(path):
+        if ids is not None:
+            ids.extend(path if key_ids is None else key_ids(path))
+            offsets.append(len(ids))
+
+    if max_paths is not None and max_paths <= 0:
+        return PathBuffer(names, ids, offsets, 0, False)
+    if source == target:
+        emit((source,))
+        return PathBuffer(names, ids, offsets, 1, True)
+
+    is_blocked = keep = None
+    if nodes_z is not None:
+        context = QueryContext(dg, nodes_z)
+        is_blocked = context.is_blocked_key
+        # Every node on an open path is an ancestor of an end point or of
+        # nodes_z, see QueryContext.ancestral_subgraph.
+        keep = ancestral_closure(parents, (source, target), context.ancestors_z)
+
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    # Only holds the nodes of the current path.
+    visited = {source}
+    path = [source]
+    # Every stack entry holds the neighbours of the corresponding path node
+    # and the position of the next neighbour to try.
+    stack = [[_neighbours(parents, children, source), 0]]
+    steps = 0
+    complete = True
+    while stack:
+        steps += 1
+        if deadline is not None and steps % _CLOCK_INTERVAL == 0 and \
+                time.perf_counter() > deadline:
+            complete = False
+            break
+        top = stack[-1]
+        neighbours, pos = top
+        if pos == len(neighbours):
+            stack.pop()
+            visited.discard(path.pop())
+            continue
+        top[1] = pos + 1
+        nxt = neighbours[pos]
+        if nxt in visited or (keep is not None and nxt not in keep):
+            continue
+        if is_blocked is not None and len(path) > 1 and is_blocked(path[-2], path[-1], nxt):
+            continue
+        if nxt == target:
+            if max_length is None or len(path) <= max_length:
+                path.append(nxt)
+                emit(path)
+                path.pop()
+                count += 1
+                if max_paths is not None and count >= max_paths:
+                    complete = False
+                    break
+            continue
+        if max_length is not None and len(path) >= max_length:
+            continue
+        path.append(nxt)
+        visited.add(nxt)
+        stack.append([_neighbours(parents, children, nxt), 0])
+    if instrument.active is not None:
+        instrument.active.count("traversal_steps", steps)
+        instrument.active.count("paths_enumerated", count)
+    return PathBuffer(names, ids, offsets, count, complete)
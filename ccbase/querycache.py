@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A cache for query results on a mutable `ccbase.graph.Graph`, which is kept
+up to date incrementally using the graph's change log (see
+`ccbase.graph.Graph.changes_since`).
+
+Every cached result remembers the nodes it depends on, so that a change
+of the graph only drops the results it can actually affect:
+
+- Whether X and Y are d-separated given Z only depends on the moral graph
+  of A = An(X u Y u Z). An edge a -> b changes that graph only if b is in
+  A, and removing a node n only if n is in A.
+- The ancestors of a node n only change if b is n or one of its
+  ancestors.
+- The Markov blanket of a node n (its parents, children and the other
+  parents of its children) only changes if n is an end point of the edge
+  or b is one of n's children, or if n or a node of the blanket is
+  removed.
+"""
+
+from collections import OrderedDict
+
+from .dsep import ancestral_closure, d_separated
+
+
+def _name(node):
+    return getattr(node, "name", node)
+
+
+class QueryCache(object):
+    """
+        Caches d-separation, ancestor and Markov blanket queries on a
+        graph. Results are stored together with the nodes they depend on
+        and dropped selectively when the graph changes. If the changes are
+        not known (e.g. after bulk operations), all results are dropped.
+
+        Attributes
+        ----------
+        graph: ccbase.graph.Graph
+            The graph the queries refer to.
+        version: int
+            The version of the graph the cached results refer to.
+        max_size: int
+            The maximum number of results that are kept.
+        hits, misses, invalidated: int
+            Statistics about the use of the cache.
+    """
+
+    def __init__(self, dg, max_size=4096):
+        self.graph = dg
+        self.version = dg.version
+        self.max_size = max_size
+        # key:(result, dependencies) pairs in least recently used order.
+        self._entries = OrderedDict()
+        self.hits = self.misses = self.invalidated = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+            Drops all cached results.
+        """
+        self.invalidated += len(self._entries)
+        self._entries.clear()
+        self.version = self.graph.version
+
+    def _affected(self, key, res, dependencies, change):
+        """
+            Checks whether the given change can affect a cached result.
+        """
+        op, node_a, node_b = change
+        if op == "add_node":
+            # A new node does not have any edges yet.
+            return False
+        if key[0] == "markov_blanket":
+            node = key[1]
+            if op == "remove_node":
+                return node == node_a or node_a in res
+            # dependencies holds the children of the node.
+            return node == node_a or node == node_b or node_b in dependencies
+        if op == "remove_node":
+            # Nodes with a child in the dependencies are dependencies too.
+            return node_a in dependencies
+        return node_b in dependencies
+
+    def _sync(self):
+        """
+            Drops all results affected by changes of the graph since the
+            last call.
+        """
+        if self.version == self.graph.version:
+            return
+        changes = self.graph.changes_since(self.version)
+        if changes is None:
+            self.clear()
+            return
+        entries = self._entries
+        for change in changes:
+            stale = [key for key, (res, deps) in entries.items()
+                     if self._affected(key, res, deps, change)]
+            for key in stale:
+                del entries[key]
+            self.invalidated += len(stale)
+        self.version = self.graph.version
+
+    def _get(self, key):
+        self._sync()
+        try:
+            res = self._entries[key][0]
+        except KeyError:
+            self.misses += 1
+            raise
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return res
+
+    def _put(self, key, res, dependencies):
+        self._entries[key] = (res, dependencies)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return res
+
+    def d_separated(self, nodes_x, nodes_y, nodes_z):
+        """
+            Cached version of `ccbase.dsep.d_separated`.
+        """
+        nodes_x = frozenset(map(_name, nodes_x))
+        nodes_y = frozenset(map(_name, nodes_y))
+        nodes_z = frozenset(map(_name, nodes_z))
+        key = ("d_separated", nodes_x, nodes_y, nodes_z)
+        try:
+            return self._get(key)
+        except KeyError:
+            pass
+        dg = self.graph
+        res = d_separated(dg, nodes_x, nodes_y, nodes_z)
+        # Unknown conditioning nodes are ignored by d_separated, but
+        # adding them later would change the result.
+        known_z = [n for n in nodes_z if n in dg.nodes]
+        dependencies = ancestral_closure(dg.iter_parents, nodes_x | nodes_y | frozenset(known_z))
+        dependencies.update(nodes_z)
+        return self._put(key, res, dependencies)
+
+    def get_ancestors(self, node):
+        """
+            Cached version of `ccbase.graph.Graph.get_ancestors`. As there,
+            a node on a directed cycle is one of its own ancestors.
+
+            Returns
+            -------
+            set
+                A set containing all ancestor nodes of the specified node.
+        """
+        node = _name(node)
+        key = ("ancestors", node)
+        nodes = self.graph.nodes
+        try:
+            res = self._get(key)
+        except KeyError:
+            res = None
+        if res is not None:
+            return {nodes[n] for n in res}
+        if node not in nodes:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+        closure = ancestral_closure(self.graph.iter_parents, (node,))
+        # The node is its own ancestor if one of its children is.
+        if any(c in closure for c in self.graph.iter_children(node)):
+            res = frozenset(closure)
+        else:
+            res = frozenset(n for n in closure if n != node)
+        self._put(key, res, closure)
+        return {nodes[n] for n in res}
+
+    def markov_blanket(self, node):
+        """
+            Computes the Markov blanket of the given node, i.e. its parents,
+            its children and the other parents of its children.
+
+            Returns
+            -------
+            frozenset of Strings
+                The names of the nodes in the Markov blanket.
+        """
+        node = _name(node)
+        key = ("markov_blanket", node)
+        try:
+            return self._get(key)
+        except KeyError:
+            pass
+        dg = self.graph
+        children = frozenset(dg.iter_children(node))
+        res = set(dg.iter_parents(node))
+        res.update(children)
+        for c in children:
+            res.update(dg.iter_parents(c))
+        res.discard(node)
+        return self._put(key, frozenset(res), children)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Search for d-separating sets.
+
+A set Z with include <= Z <= restrict d-separates X from Y if and only if
+it separates them in the moral graph of An(X u Y u include), where Z may
+be restricted to that ancestral set without loss of generality. A
+smallest such set is therefore a minimum vertex cut between X and Y in
+that moral graph, which `find_minimal_separator` computes with a max-flow
+algorithm in polynomial time: every node that may be added to Z is split
+into an "in" and an "out" vertex connected by an edge of capacity one,
+all other edges have infinite capacity.
+"""
+
+from collections import deque
+
+from .dsep import (_adjacency, _check_nodes, _moral_neighbours, ancestral_closure,
+                   d_separated)
+
+_INF = float("inf")
+
+
+def _keys(dg, nodes, index):
+    """
+        Like `ccbase.dsep._check_nodes`, but allows nodes to be None.
+    """
+    if nodes is None:
+        return None
+    return _check_nodes(dg, nodes, index)
+
+
+def _names(dg, keys, index):
+    if index is None:
+        return set(keys)
+    names = dg.names
+    return {names[k] for k in keys}
+
+
+class _FlowNetwork(object):
+    """
+        A residual network for unit and infinite capacities.
+    """
+
+    def __init__(self):
+        self.adj = {}
+        self.capacity = {}
+
+    def add_edge(self, u, v, capacity):
+        self.adj.setdefault(u, []).append(v)
+        self.adj.setdefault(v, []).append(u)
+        self.capacity[u, v] = self.capacity.get((u, v), 0) + capacity
+        self.capacity.setdefault((v, u), 0)
+
+    def _augmenting_path(self, source, sink):
+        """
+            Finds a shortest path with free capacity by breadth first
+            search and returns the predecessor of every visited vertex.
+        """
+        previous = {source: None}
+        queue = deque([source])
+        capacity = self.capacity
+        while queue:
+            u = queue.popleft()
+            for v in self.adj.get(u, ()):
+                if v not in previous and capacity[u, v] > 0:
+                    previous[v] = u
+                    if v == sink:
+                        return previous
+                    queue.append(v)
+        return previous
+
+    def max_flow(self, source, sink):
+        """
+            Augments the flow until no augmenting path is left.
+
+            Returns
+            -------
+            set or None
+                The vertices reachable from the source in the residual
+                network, or None if the flow is unbounded.
+        """
+        capacity = self.capacity
+        while True:
+            previous = self._augmenting_path(source, sink)
+            if sink not in previous:
+                return set(previous)
+            path = []
+            v = sink
+            while previous[v] is not None:
+                path.append((previous[v], v))
+                v = previous[v]
+            bottleneck = min(capacity[e] for e in path)
+            if bottleneck == _INF:
+                return None
+            for u, v in path:
+                capacity[u, v] -= bottleneck
+                capacity[v, u] += bottleneck
+
+
+def find_minimal_separator(dg, nodes_x, nodes_y, include=None, restrict=None):
+    """
+        Finds a smallest set of nodes that d-separates nodes_x from
+        nodes_y, using a minimum vertex cut in the moral ancestral graph.
+        The result is minimum (and therefore also minimal) among all
+        separators with include <= Z <= restrict.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        nodes_x: iterable of ccbase.nodes.Node or String
+            The first set of nodes.
+        nodes_y: iterable of ccbase.nodes.Node or String
+            The second set of nodes.
+        include: iterable of ccbase.nodes.Node or String, optional
+            Nodes that must be part of the separator.
+        restrict: iterable of ccbase.nodes.Node or String, optional
+            The only nodes that may be part of the separator. Defaults to
+            all nodes except those in nodes_x and nodes_y.
+
+        Returns
+        -------
+        set of Strings or None
+            The names of the nodes in the separator, or None if there is
+            no separator with include <= Z <= restrict.
+
+        Raises
+        ----------
+        ValueError
+            If any of the given nodes is not in the graph, or if include
+            is not a subset of restrict.
+    """
+    parents, children, index = _adjacency(dg)
+    sources = _check_nodes(dg, nodes_x, index)
+    targets = _check_nodes(dg, nodes_y, index)
+    include = _keys(dg, include, index) or set()
+    restrict = _keys(dg, restrict, index)
+    if restrict is not None and not include <= restrict:
+        raise ValueError("All nodes in include need to be contained in restrict.")
+    if not sources.isdisjoint(targets):
+        return None
+    include -= sources | targets
+    keep = ancestral_closure(parents, sources | targets | include)
+    neighbours = _moral_neighbours(parents, children, keep)
+
+    # Vertex (key, False) is the "in" vertex of a node, (key, True) its
+    # "out" vertex. Nodes in include are conditioned on and thus removed.
+    network = _FlowNetwork()
+    source, sink = object(), object()
+    for key in keep:
+        if key in include:
+            continue
+        if key in sources or key in targets or (restrict is not None and key not in restrict):
+            network.add_edge((key, False), (key, True), _INF)
+        else:
+            network.add_edge((key, False), (key, True), 1)
+        for n in neighbours(key):
+            if n != key and n not in include:
+                network.add_edge((key, True), (n, False), _INF)
+    for key in sources:
+        network.add_edge(source, (key, False), _INF)
+    for key in targets:
+        network.add_edge((key, True), sink, _INF)
+
+    reachable = network.max_flow(source, sink)
+    if reachable is None:
+        return None
+    cut = {key for key in keep
+           if (key, False) in reachable and (key, True) not in reachable}
+    return _names(dg, cut | include, index)
+
+
+def _moral_reachable(neighbours, sources, nodes_z):
+    """
+        Collects all nodes reachable from the sources in a moral graph,
+        entering but never passing through nodes in nodes_z.
+    """
+    seen = set(sources)
+    stack = list(sources)
+    while stack:
+        for n in neighbours(stack.pop()):
+            if n not in seen:
+                seen.add(n)
+                if n not in nodes_z:
+                    stack.append(n)
+    return seen
+
+
+def is_minimal_separator(dg, nodes_x, nodes_y, nodes_z, include=None, restrict=None):
+    """
+        Checks whether nodes_z d-separates nodes_x from nodes_y and no
+        proper subset of nodes_z that still contains include does.
+
+        Parameters
+        ----------
+        dg: ccbase.graph.Graph
+            The graph that should contain all the nodes.
+        nodes_x: iterable of ccbase.nodes.Node or String
+            The first set of nodes.
+        nodes_y: iterable of ccbase.nodes.Node or String
+            The second set of nodes.
+        nodes_z: iterable of ccbase.nodes.Node or String
+            The separator to check.
+        include: iterable of ccbase.nodes.Node or String, optional
+            Nodes that must be part of the separator.
+        restrict: iterable of ccbase.nodes.Node or String, optional
+            The only nodes that may be part of the separator.
+
+        Returns
+        -------
+        bool
+            True if nodes_z is a minimal separator with
+            include <= nodes_z <= restrict, False otherwise.
+
+        Raises
+        ----------
+        ValueError
+            If any of the given nodes is not in the graph.
+    """
+    parents, children, index = _adjacency(dg)
+    sources = _check_nodes(dg, nodes_x, index)
+    targets = _check_nodes(dg, nodes_y, index)
+    z = _check_nodes(dg, nodes_z, index)
+    include = _keys(dg, include, index) or set()
+    restrict = _keys(dg, restrict, index)
+    if not include <= z or (restrict is not None and not z <= restrict):
+        return False
+    if not z.isdisjoint(sources | targets):
+        return False
+    # Every node of a minimal separator is an ancestor of X, Y or include.
+    keep = ancestral_closure(parents, sources | targets | include)
+    if not z <= keep:
+        return False
+    if not d_separated(dg, nodes_x, nodes_y, nodes_z):
+        return False
+    # A node can only be dropped from Z if it is not needed to block some
+    # path, i.e. if it can not be reached from both X and Y in the moral
+    # graph without passing through other nodes of Z.
+    neighbours = _moral_neighbours(parents, children, keep)
+    from_x = _moral_reachable(neighbours, sources, z)
+    from_y = _moral_reachable(neighbours, targets, z)
+    return all(key in from_x and key in from_y for key in z - include)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+A local query server that keeps named graphs in memory, so that scripts do
+not need to rebuild them for every handful of queries. See
+`ccbase.client.GraphClient` for the corresponding client.
+
+The server speaks JSON lines over a Unix socket or TCP: every request is a
+single line holding an object such as
+
+    {"id": 1, "method": "check_independence", "graph": "alarm",
+     "params": {"x": ["A"], "y": ["B"], "z": ["C"]}}
+
+and is answered by a line {"id": 1, "result": ...} or
+{"id": 1, "error": {"type": "ValueError", "message": "..."}}. Requests on
+the same connection may be pipelined, their responses can arrive in any
+order.
+
+All graph computations run in an executor, so that the event loop stays
+responsive. Independence queries against the same graph that arrive
+within a short delay are coalesced into a batch, which shares the work
+for queries with the same conditioning set (see `ccbase.dsep.QueryContext`).
+
+Usage: python -m ccbase.server (--socket PATH | --host HOST --port PORT)
+                               [--graph NAME=PATH ...]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+from functools import partial
+
+from .classify import classify_nodes
+from .dsep import QueryContext, ReachCache, _name
+from .fileio import load_binary, read_csv, read_edgelist, read_jsonl
+from .paths import iter_paths
+
+# Readers used by `load_graph`, by file extension.
+_READERS = {
+    ".bin": load_binary,
+    ".ccbg": load_binary,
+    ".csv": read_csv,
+    ".jsonl": read_jsonl,
+    ".json": read_jsonl,
+}
+
+
+def load_graph(path, format=None):
+    """
+        Reads a graph file, choosing the reader by the file's extension
+        unless a format ("binary", "csv", "jsonl" or "edgelist") is given.
+    """
+    if format is None:
+        reader = _READERS.get(os.path.splitext(path)[1].lower(), read_edgelist)
+    else:
+        reader = {"binary": load_binary, "csv": read_csv, "jsonl": read_jsonl,
+                  "edgelist": read_edgelist}[format]
+    return reader(path)
+
+
+def _check_batch(dg, queries):
+    """
+        Answers a batch of (nodes_x, nodes_y, nodes_z) queries. Queries
+        sharing a conditioning set share a `ccbase.dsep.QueryContext`, and
+        all contexts share one `ccbase.dsep.ReachCache`. Failing queries
+        do not affect the others.
+
+        Returns
+        -------
+        list of (bool, object) tuples
+            (True, result) or (False, exception) for every query.
+    """
+    cache = ReachCache()
+    contexts = {}
+    res = []
+    for nodes_x, nodes_y, nodes_z in queries:
+        try:
+            key = frozenset(map(_name, nodes_z))
+            context = contexts.get(key)
+            if context is None:
+                context = contexts[key] = QueryContext(dg, key, cache)
+            res.append((True, context.d_separated(nodes_x, nodes_y)))
+        except Exception as e:
+            res.append((False, e))
+    return res
+
+
+def _get_paths(dg, x, y, z=None, limit=None, max_len=None):
+    return list(iter_paths(dg, x, y, max_len, limit, z))
+
+
+def _locked(lock, func, *args):
+    with lock:
+        return func(*args)
+
+
+def _names(nodes):
+    return sorted(_name(n) for n in nodes)
+
+
+class _Batch(object):
+    """
+        Collects independence queries against one graph until they are
+        answered together.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.futures = []
+
+
+class GraphServer(object):
+    """
+        Serves queries against named, resident graphs.
+
+        Attributes
+        ----------
+        graphs: dict
+            A dictionary containing name:graph pairs of all loaded graphs.
+        executor: concurrent.futures.Executor
+            The executor running the computations. Defaults to the event
+            loop's default executor. Graphs are shared between the
+            requests, so this should be a thread (not a process) pool.
+            Computations on the same graph are run one at a time, as
+            the caches of a `ccbase.graph.Graph` are not thread safe.
+        batch_delay: float
+            The time in seconds independence queries are collected before
+            they are answered as a batch.
+        max_batch: int
+            Batches are answered immediately once they hold this many
+            queries.
+        stats: dict
+            Counters of the requests, queries and batches handled.
+    """
+
+    def __init__(self, graphs=None, executor=None, batch_delay=0.002, max_batch=256):
+        self.graphs = dict(graphs or {})
+        self.executor = executor
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.stats = {"requests": 0, "queries": 0, "batches": 0}
+        self._batches = {}
+        # One lock per graph name, see _run_on.
+        self._locks = {}
+        self._server = None
+
+    def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def _run_on(self, name, func, *args):
+        """
+            Runs func in the executor while holding the lock of the given
+            graph.
+        """
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = threading.Lock()
+        return self._run(_locked, lock, func, *args)
+
+    def _graph(self, name):
+        try:
+            return self.graphs[name]
+        except KeyError:
+            raise ValueError("The server does not hold a graph called {}".format(name))
+
+    def _submit(self, name, query):
+        """
+            Adds a query to the pending batch of the given graph and
+            returns a future for its result.
+        """
+        self._graph(name)
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(name)
+        if batch is None:
+            batch = self._batches[name] = _Batch()
+            loop.call_later(self.batch_delay, self._flush, name, batch)
+        future = loop.create_future()
+        batch.queries.append(query)
+        batch.futures.append(future)
+        if len(batch.queries) >= self.max_batch:
+            self._flush(name, batch)
+        return future
+
+    def _flush(self, name, batch):
+        """
+            Starts answering the given batch, unless this already happened.
+        """
+        if self._batches.get(name) is not batch:
+            return
+        del self._batches[name]
+        self.stats["batches"] += 1
+        asyncio.ensure_future(self._answer(name, batch))
+
+    async def _answer(self, name, batch):
+        try:
+            results = await self._run_on(name, _check_batch, self._graph(name), batch.queries)
+        except Exception as e:
+            results = [(False, e)] * len(batch.futures)
+        for future, (ok, value) in zip(batch.futures, results):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def handle_request(self, request):
+        """
+            Answers a single request, see the module documentation.
+
+            Parameters
+            ----------
+            request: dict
+                The decoded request.
+
+            Returns
+            -------
+            object
+                The JSON serializable result.
+
+            Raises
+            ----------
+            ValueError
+                If the request is invalid or refers to unknown graphs or
+                nodes.
+        """
+        self.stats["requests"] += 1
+        method = request.get("method")
+        params = request.get("params") or {}
+        name = request.get("graph")
+        if method == "graphs":
+            return sorted(self.graphs)
+        if method == "stats":
+            return dict(self.stats)
+        if method == "load":
+            if not name:
+                raise ValueError("Loading a graph requires a name")
+            self.graphs[name] = await self._run(load_graph, params["path"], params.get("format"))
+            return self.graphs[name].num_nodes
+        if method == "unload":
+            return self.graphs.pop(name, None) is not None
+        if method == "check_independence":
+            self.stats["queries"] += 1
+            return await self._submit(name, (params["x"], params["y"], params.get("z", ())))
+        dg = self._graph(name)
+        if method == "get_paths":
+            return await self._run_on(name, _get_paths, dg, params["x"], params["y"],
+                                      params.get("z"), params.get("limit"), params.get("max_len"))
+        if method in ("forks", "colliders", "chains"):
+            res = await self._run_on(name, classify_nodes, dg)
+            return _names(res[method])
+        if method == "ancestors":
+            return _names(await self._run_on(name, dg.get_ancestors, params["node"]))
+        if method == "descendants":
+            return _names(await self._run_on(name, dg.get_descendants, params["node"]))
+        raise ValueError("Unknown method {}".format(method))
+
+    async def _respond(self, line, writer, lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            response = {"id": request_id, "result": await self.handle_request(request)}
+        except Exception as e:
+            response = {"id": request_id,
+                        "error": {"type": type(e).__name__, "message": str(e)}}
+        async with lock:
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def start(self, path=None, host=None, port=None):
+        """
+            Starts listening on a Unix socket at path, or on host and port.
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle_connection, path)
+        else:
+            self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        """
+            Stops listening for new connections.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self, path=None, host=None, port=None):
+        """
+            Starts the server and serves requests until cancelled.
+        """
+        server = await self.start(path, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", help="the path of the Unix socket to listen on")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--graph", action="append", default=[], metavar="NAME=PATH",
+                        help="load the graph file at PATH under NAME at start")
+    args = parser.parse_args(argv)
+
+    server = GraphServer()
+    for spec in args.graph:
+        name, _, path = spec.partition("=")
+        server.graphs[name] = load_graph(path)
+    try:
+        asyncio.run(server.serve_forever(args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read-only views on graphs. A view does not copy any nodes or edges, it
+only changes how the neighbours of the underlying graph are presented.
+Any change to the underlying graph is immediately visible in its views.
+"""
+
+from collections.abc import Mapping
+from itertools import chain
+
+
+class GraphView(object):
+    """
+        Base class for read-only views on a `ccbase.graph.Graph` (or on
+        another view). Subclasses only need to overwrite `iter_parents` and
+        `iter_children`, all other query methods are built on top of these.
+
+        Attributes
+        ----------
+        graph: ccbase.graph.Graph
+            The underlying graph (or view).
+        is_directed: bool
+            A boolean indicating if the view presents a directed graph.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.is_directed = graph.is_directed
+
+    @property
+    def nodes(self):
+        """
+            The node-name:`ccbase.nodes.Node` mapping of the underlying graph.
+            Note that the node objects themselves still hold the parents and
+            children of the underlying graph.
+        """
+        return self.graph.nodes
+
+    def get_number_of_nodes(self):
+        """
+            Returns
+            -------
+            int
+                The total number of nodes in the view.
+        """
+        return len(self.nodes)
+
+    @property
+    def num_nodes(self):
+        """
+            Performs the same as "get_number_of_nodes" but as a property.
+        """
+        return len(self.nodes)
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the parents of the given node.
+        """
+        return self.graph.iter_parents(node)
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the children of the given node.
+        """
+        return self.graph.iter_children(node)
+
+    def get_parents(self, node, return_names=True):
+        """
+            Collects and returns all parents of the given node, see
+            `ccbase.graph.Graph.get_parents`.
+        """
+        if return_names:
+            return list(self.iter_parents(node))
+        return [self.nodes[n] for n in self.iter_parents(node)]
+
+    def get_children(self, node, return_names=True):
+        """
+            Collects and returns all children of the given node, see
+            `ccbase.graph.Graph.get_children`.
+        """
+        if return_names:
+            return list(self.iter_children(node))
+        return [self.nodes[n] for n in self.iter_children(node)]
+
+    def in_degree(self, node):
+        """
+            Returns the number of parents of the given node.
+        """
+        return sum(1 for _ in self.iter_parents(node))
+
+    def out_degree(self, node):
+        """
+            Returns the number of children of the given node.
+        """
+        return sum(1 for _ in self.iter_children(node))
+
+    def iter_degrees(self):
+        """
+            Iterates over (node name, number of parents, number of children)
+            tuples for all nodes.
+        """
+        return ((n, self.in_degree(n), self.out_degree(n)) for n in self.nodes)
+
+    def to_undirected(self, as_view=True):
+        """
+            Returns an undirected view of this view. Views can not be copied,
+            so as_view is only accepted for compatibility with
+            `ccbase.graph.Graph.to_undirected`.
+        """
+        return UndirectedView(self)
+
+    def reverse(self, as_view=True):
+        """
+            Returns a view of this view with all edges reversed.
+        """
+        return ReversedView(self)
+
+    def markov_blanket(self, node):
+        """
+            Returns the Markov blanket of the given node within this view,
+            see `ccbase.graph.Graph.markov_blanket`.
+        """
+        from .blankets import markov_blanket
+        return markov_blanket(self, node)
+
+    def markov_blankets(self, as_matrix=False):
+        """
+            Returns the Markov blankets of all nodes of this view, see
+            `ccbase.graph.Graph.markov_blankets`.
+        """
+        from .blankets import markov_blankets
+        return markov_blankets(self, as_matrix)
+
+    def subgraph(self, nodes):
+        """
+            Returns a view on the given nodes of this view, see
+            `ccbase.graph.Graph.subgraph`.
+        """
+        return SubgraphView(self, nodes)
+
+    def without(self, nodes):
+        """
+            Returns a view on this view without the given nodes, see
+            `ccbase.graph.Graph.without`.
+        """
+        return ExcludingView(self, nodes)
+
+    def moralize(self):
+        """
+            Creates the moral graph of this view, see
+            `ccbase.graph.Graph.moralize`.
+
+            Returns
+            -------
+            ccbase.graph.Graph
+                An undirected graph with the edges of the moral graph.
+        """
+        from .dsep import moralize
+        return moralize(self)
+
+
+class UndirectedView(GraphView):
+    """
+        Presents the neighbours of each node, i.e. the union of its parents
+        and its children, both as its parents and as its children. This
+        corresponds to `ccbase.graph.Graph.to_undirected` without copying.
+    """
+
+    def __init__(self, graph):
+        super(UndirectedView, self).__init__(graph)
+        self.is_directed = False
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of all neighbours of the given node,
+            children first.
+        """
+        children = list(self.graph.iter_children(node))
+        if not children:
+            return self.graph.iter_parents(node)
+        seen = set(children)
+        return chain(children, (p for p in self.graph.iter_parents(node) if p not in seen))
+
+    iter_parents = iter_children
+
+
+class ReversedView(GraphView):
+    """
+        Presents the parents of each node as its children and vice versa.
+    """
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the children of the given node in
+            the underlying graph.
+        """
+        return self.graph.iter_children(node)
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the parents of the given node in
+            the underlying graph.
+        """
+        return self.graph.iter_parents(node)
+
+
+class SubgraphView(GraphView):
+    """
+        Presents only the given nodes of the underlying graph and the edges
+        between them.
+
+        Attributes
+        ----------
+        graph: ccbase.graph.Graph
+            The underlying graph (or view).
+    """
+
+    def __init__(self, graph, nodes):
+        super(SubgraphView, self).__init__(graph)
+        graph_nodes = graph.nodes
+        self._nodes = {}
+        for n in nodes:
+            n = getattr(n, "name", n)
+            try:
+                self._nodes[n] = graph_nodes[n]
+            except KeyError:
+                raise ValueError("The graph does not contain a node called {}".format(n))
+
+    @property
+    def nodes(self):
+        """
+            The node-name:`ccbase.nodes.Node` mapping of the nodes in the
+            view.
+        """
+        return self._nodes
+
+    def _check(self, node):
+        if node not in self._nodes:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the parents of the given node that
+            are part of the view.
+        """
+        self._check(node)
+        nodes = self._nodes
+        return (p for p in self.graph.iter_parents(node) if p in nodes)
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the children of the given node that
+            are part of the view.
+        """
+        self._check(node)
+        nodes = self._nodes
+        return (c for c in self.graph.iter_children(node) if c in nodes)
+
+
+class _RemainingNodes(Mapping):
+    """
+        A read-only node-name:node mapping presenting all nodes of a graph
+        except the excluded ones, without copying the graph's mapping.
+    """
+
+    def __init__(self, nodes, excluded):
+        self._all = nodes
+        self._excluded = excluded
+
+    def __getitem__(self, name):
+        if name in self._excluded:
+            raise KeyError(name)
+        return self._all[name]
+
+    def __contains__(self, name):
+        return name not in self._excluded and name in self._all
+
+    def __iter__(self):
+        excluded = self._excluded
+        return (n for n in self._all if n not in excluded)
+
+    def __len__(self):
+        return len(self._all) - sum(1 for n in self._excluded if n in self._all)
+
+
+class ExcludingView(GraphView):
+    """
+        Presents the underlying graph without the given nodes and their
+        edges. Unlike `SubgraphView`, creating the view only takes time in
+        the number of excluded nodes.
+
+        Attributes
+        ----------
+        graph: ccbase.graph.Graph
+            The underlying graph (or view).
+    """
+
+    def __init__(self, graph, nodes):
+        super(ExcludingView, self).__init__(graph)
+        graph_nodes = graph.nodes
+        self._excluded = set()
+        for n in nodes:
+            n = getattr(n, "name", n)
+            if n not in graph_nodes:
+                raise ValueError("The graph does not contain a node called {}".format(n))
+            self._excluded.add(n)
+        self._nodes = _RemainingNodes(graph_nodes, self._excluded)
+
+    @property
+    def nodes(self):
+        """
+            The node-name:`ccbase.nodes.Node` mapping of the nodes in the
+            view.
+        """
+        return self._nodes
+
+    def _check(self, node):
+        if node in self._excluded or node not in self.graph.nodes:
+            raise ValueError("The graph does not contain a node called {}".format(node))
+
+    def iter_parents(self, node):
+        """
+            Iterates over the names of the parents of the given node that
+            are part of the view.
+        """
+        self._check(node)
+        excluded = self._excluded
+        return (p for p in self.graph.iter_parents(node) if p not in excluded)
+
+    def iter_children(self, node):
+        """
+            Iterates over the names of the children of the given node that
+            are part of the view.
+        """
+        self._check(node)
+        excluded = self._excluded
+        return (c for c in self.graph.iter_children(node) if c not in excluded)